@@ -1,41 +1,123 @@
 # coding=utf-8
+import asyncio
+import io
 import os
-from datetime import datetime
+import time
+from urllib.parse import urlparse
 
+import aiohttp
 import discord
 from discord.ext import commands, tasks
 
 import automatik.utils.cli
 import automatik.utils.update
 from automatik import logger, SRC_DIR
-from automatik.core.llm import LLMParser
-from automatik.utils.igdb_client import IGDBClient
 from automatik.commands.admin import AdminSlash
 from automatik.commands.owner import OwnerSlash
+from automatik.core.broadcast import Broadcaster, FailureDigest, RenderCache, pack_embeds
+from automatik.core import metrics
+from automatik.core.cluster import default_holder_id
 from automatik.core.config import Config
 from automatik.core.database import Database
+from automatik.core.enrichment import GameEnricher
 from automatik.core.errors import GameRetrievalException, InvalidGameDataException
 from automatik.core.game import GameAdapter, Game
 from automatik.core.language import LanguageManager
+from automatik.core.profiler import PROFILER
+from automatik.core.scheduler import PollingScheduler
 from automatik.core.services import ServiceLoader
-
-
-class AutomatikBot(commands.Bot):
-    def __init__(self, command_prefix, intents):
-        commands.Bot.__init__(self, command_prefix=command_prefix, intents=intents)
+from automatik.utils import html_parsing
+from automatik.utils.log_setup import setup_logging
+
+
+class AutomatikBot(commands.AutoShardedBot):
+    def __init__(self, command_prefix, intents, config=None):
+        self.config = config or Config(".env")
+        if self.config.HTML_PARSER:  # The .env file is only read now, after the parsing module was imported
+            html_parsing.PARSER_BACKEND = html_parsing.resolve_backend(self.config.HTML_PARSER)
+        # Without SHARD_COUNT and SHARD_IDS, Discord's recommended number of shards is run in this process
+        commands.AutoShardedBot.__init__(
+            self,
+            command_prefix=command_prefix,
+            intents=intents,
+            shard_count=self.config.SHARD_COUNT or None,  # Empty in the .env template
+            shard_ids=self.config.SHARD_IDS or None
+        )
         self.is_first_execution = True
         self.languages = LanguageManager(os.path.join(SRC_DIR, "lang"))
-        self.config = Config(".env")
-        self.database = Database(self.config.DB_URI)
-        self.llm_parser = LLMParser(self.config.LLM_MODEL) if self.config.LLM_MODEL else None
         self._debug_guild = discord.Object(id=self.config.DEBUG_GUILD_ID) if self.config.DEBUG_GUILD_ID else None
-        self.igdb = IGDBClient(self.config.IGDB_CLIENT_ID, self.config.IGDB_CLIENT_SECRET) if self.config.IGDB_CLIENT_ID and self.config.IGDB_CLIENT_SECRET else None
+        self.broadcaster = Broadcaster(self.config.BROADCAST_CONCURRENCY or 10)
+        self.scheduler = PollingScheduler()
+        self.delivery_failures = FailureDigest(self.config.LOG_FAILURE_SAMPLES or 5)
+        self._asset_base_url = self._get_asset_base_url()
+        # Everything depending on the database is set up by 'setup_resources' once logged in
+        self.database = None
+        self.llm_parser = None
+        self.igdb = None
+        self.enricher = None
+        self.lease = None
+        self.outbox = None
+        self._cursor_id = None  # Identifies the announcement cursor of this cluster, see 'setup_resources'
+        self._last_announcement_id = None
+        self.http_session = None  # Shared by every webhook delivery, created once the event loop is running
+        self._metrics_runner = None
+        self._background_tasks = set()
 
         self.main_loop = True
-        self.load_resources()
         self.remove_command("help")  # There is a default 'help' command which shows docstrings
 
+    def _get_asset_base_url(self):
+        """Returns the validated 'ASSET_BASE_URL' without its trailing slash, or None to upload the logos instead."""
+        if not (asset_base_url := self.config.ASSET_BASE_URL):
+            return None
+        url = urlparse(str(asset_base_url))
+        if url.scheme not in ("http", "https") or not url.netloc:
+            logger.warning(f"Ignoring 'ASSET_BASE_URL', {asset_base_url!r} is not an http(s) URL")
+            return None
+        return str(asset_base_url).rstrip("/")
+
+    def setup_resources(self):
+        """Connects to the database and builds everything that depends on it, then loads the resources.
+           The AI fallback and IGDB stacks are only imported when they are configured."""
+        self.database = Database(
+            self.config.DB_URI,
+            config_cache_size=self.config.GUILD_CONFIG_CACHE_SIZE or 10000,
+            config_cache_ttl=self.config.GUILD_CONFIG_CACHE_TTL or 3600
+        )
+        if self.config.GUILD_CONFIG_CHANGE_STREAM:
+            self.database.watch_guild_configs()
+        if self.config.LLM_MODEL:
+            from automatik.core.llm import LLMParser
+            self.llm_parser = LLMParser(
+                self.config.LLM_MODEL,
+                cache=self.database.get_cache("llm", 7 * 24 * 60 * 60),
+                timeout=self.config.LLM_TIMEOUT or 120
+            )
+        if self.config.IGDB_CLIENT_ID and self.config.IGDB_CLIENT_SECRET:
+            from automatik.utils.igdb_client import IGDBClient
+            self.igdb = IGDBClient(
+                self.config.IGDB_CLIENT_ID,
+                self.config.IGDB_CLIENT_SECRET,
+                cache=self.database.get_cache("igdb", self.config.IGDB_CACHE_TTL or 30 * 24 * 60 * 60)
+            )
+        self.enricher = GameEnricher(self.igdb)
+        # Only the holder of the lease scrapes, every cluster broadcasts the games it announces
+        self.lease = self.database.get_leader_lease(str(self.config.CLUSTER_ID or default_holder_id()), ttl=90)
+        # Each cluster resumes from its stored cursor, a single cluster doesn't need a CLUSTER_ID for that
+        self._cursor_id = str(self.config.CLUSTER_ID or "default")
+        self._last_announcement_id = self.database.get_announcement_cursor(self._cursor_id)
+        if self._last_announcement_id is None:  # Older announcements would reach guilds subscribed since then
+            self._last_announcement_id = self.database.get_announcement_id_at(time.time())
+            self.database.save_announcement_cursor(self._cursor_id, self._last_announcement_id)
+        self.outbox = self.database.get_outbox()
+        self.load_resources()
+
     async def setup_hook(self):
+        # Runs once logged in, before connecting to the gateway
+        await asyncio.to_thread(self.setup_resources)
+        self.http_session = aiohttp.ClientSession()
+        if self.config.METRICS_PORT:
+            self._metrics_runner = await metrics.start_metrics_server(self.config.METRICS_PORT, self.config.METRICS_HOST or "127.0.0.1")
         await self.add_cog(AdminSlash(self, self.languages, self.config, self.database))
         if self._debug_guild:
             await self.add_cog(OwnerSlash(self, self.languages, self.config, self.database), guild=self._debug_guild)
@@ -43,56 +125,82 @@ class AutomatikBot(commands.Bot):
     async def close(self):
         self.tree.clear_commands(guild=self._debug_guild)
         await self.tree.sync(guild=self._debug_guild)
+        if self.igdb:
+            await self.igdb.close()
+        if self.lease:
+            self.renew_lease.cancel()
+            await asyncio.to_thread(self.lease.release)
+        if self.http_session:
+            await self.http_session.close()
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
         await super().close()
 
     async def on_ready(self):
         if self.is_first_execution:
             self.is_first_execution = False
+            self.renew_lease.start()
             self.look_for_free_games.start()
+            # Nothing the bot needs to connect, so it's left for after connecting
+            self._run_in_background(asyncio.to_thread(automatik.utils.update.check_updates))
+            if self.igdb:
+                self._run_in_background(self.igdb.prefetch_token())
             await self.tree.sync(guild=self._debug_guild)
             logger.info(
                 f"Bot ready, logged in as {self.user} ({self.user.id}), "
-                f"serving {len(self.guilds)} guild(s)"
+                f"serving {len(self.guilds)} guild(s) on shard(s) {sorted(self.shards)} of {self.shard_count}"
             )
         # await self.change_presence(status=discord.Status.online, activity=discord.Game("!mk help"))
 
+    def _run_in_background(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)  # The event loop only keeps weak references to tasks
+        task.add_done_callback(self._background_tasks.discard)
+
     def load_resources(self):
         """Loads configuration, services and language packages."""
-        ServiceLoader.load_services()
+        ServiceLoader.load_services(self.database)
         self.languages.load_language_files()
         # Services are added to the documents from the 'configs' collection on runtime
         self.database.insert_missing_or_new_services()
+        self.database.load_subscribers()
 
     def create_game_embed(self, game: Game):
+        """Builds the notification embed of a game, returns it along with the filename and bytes of its thumbnail.
+           Thumbnails are named after their service, so a message packing games of several services can
+           attach each one once and every embed points to its own. When 'ASSET_BASE_URL' is set, the
+           thumbnail is linked from there instead and nothing has to be uploaded (None, None is returned)."""
         service = ServiceLoader.get_service(game.SERVICE_ID)
         embed = discord.Embed(
             title=f"{game.NAME} is free!",
             url=game.LINK,
             color=service.EMBED_COLOR
         )
-        embed.set_thumbnail(url="attachment://thumbnail.png")
+        if self._asset_base_url:
+            embed.set_thumbnail(url=f"{self._asset_base_url}/{service.SERVICE_IMAGE}")
+            thumbnail_name = None
+        else:
+            thumbnail_name = f"{service.SERVICE_ID}.png"
+            embed.set_thumbnail(url=f"attachment://{thumbnail_name}")
         embed.set_author(name=service.SERVICE_NAME)
-        embed.set_image(url=game.promo_img_url)
+        embed.set_image(url=game.IMAGE_URL)
 
-        if (igdb_data := self.igdb.get_game_data(game.NAME)) is not None:
-            # Game summary
-            if igdb_data.get("summary"):
-                summary = igdb_data["summary"]
-                if len(summary) > 300:
-                    summary = summary[:297] + "..."
-                embed.description = summary
+        # Game summary
+        if game.SUMMARY:
+            summary = game.SUMMARY
+            if len(summary) > 300:
+                summary = summary[:297] + "..."
+            embed.description = summary
 
-            # Game genres
-            if igdb_data.get("genres"):
-                genres = ", ".join([g["name"] for g in igdb_data["genres"][:3]])
-                embed.add_field(name="Genres", value=genres, inline=True)
+        # Game genres
+        if game.GENRES:
+            embed.add_field(name="Genres", value=", ".join(game.GENRES[:3]), inline=True)
 
-            # Game release year
-            if igdb_data.get("first_release_date"):
-                release_year = datetime.fromtimestamp(igdb_data["first_release_date"]).year
-                embed.add_field(name="Released", value=str(release_year), inline=True)
+        # Game release year
+        if game.RELEASE_YEAR:
+            embed.add_field(name="Released", value=str(game.RELEASE_YEAR), inline=True)
 
-        return embed, discord.File(f"automatik/services/assets/{service.SERVICE_IMAGE}", filename="thumbnail.png")
+        return embed, thumbnail_name, ServiceLoader.get_asset(service.SERVICE_ID) if thumbnail_name else None
 
     async def on_command_error(self, interaction, error):
         """Method used for error handling regarding the discord.py library."""
@@ -121,75 +229,274 @@ class AutomatikBot(commands.Bot):
                 exc_info=error
             )
 
-    @tasks.loop(minutes=15)
+    async def _fetch_service_games(self, service):
+        """Retrieves the current free games of a service.
+           Returns None if they could not be retrieved or didn't change since the last cycle."""
+        start_time = time.perf_counter()
+        try:
+            games = await asyncio.wait_for(service.get_free_games_async(), timeout=service.FETCH_TIMEOUT)
+            metrics.SERVICE_POLL_SECONDS.observe(time.perf_counter() - start_time, service=service.SERVICE_ID)
+            self.scheduler.record_success(service)
+            return games
+        except asyncio.TimeoutError:
+            metrics.SERVICE_ERRORS.inc(service=service.SERVICE_ID, reason="timeout")
+            logger.warning(f"'{service.SERVICE_ID}' did not respond within {service.FETCH_TIMEOUT}s, skipping")
+        except GameRetrievalException:
+            metrics.SERVICE_ERRORS.inc(service=service.SERVICE_ID, reason="retrieval")
+            logger.warning(f"Failed to retrieve data from '{service.SERVICE_ID}', skipping", exc_info=True)
+        except InvalidGameDataException as e:
+            metrics.SERVICE_ERRORS.inc(service=service.SERVICE_ID, reason="invalid_data")
+            logger.warning(
+                f"Malformed data from '{service.SERVICE_ID}'"
+                + (", retrying with AI fallback" if self.llm_parser else ", skipping (no LLM configured)"),
+                exc_info=True
+            )
+            self.scheduler.record_success(service)  # The service is reachable, polling it more often won't help
+            if self.llm_parser is not None:
+                return await self._parse_with_llm(service, e.raw_data)
+            return None
+        except:  # Any unhandled exception in any service would abruptly stop the current iteration without this
+            metrics.SERVICE_ERRORS.inc(service=service.SERVICE_ID, reason="unexpected")
+            logger.exception(f"Unexpected error while fetching data from '{service.SERVICE_ID}'")
+        self.scheduler.record_failure(service)
+        return None
+
+    async def _parse_with_llm(self, service, raw_data=None):
+        """Extracts the free games of a service using the LLM parser, returns None if it fails as well."""
+        try:
+            if raw_data is None:  # The payload is only downloaded again if the service didn't keep it
+                raw_data = await asyncio.to_thread(service.make_request)
+            games = await self.llm_parser.to_dict(raw_data, service.SERVICE_ID)
+            return [GameAdapter.to_object(game) for game in games]
+        except asyncio.TimeoutError:
+            logger.warning(f"AI fallback for '{service.SERVICE_ID}' timed out after {self.llm_parser.timeout}s")
+        except Exception:
+            logger.exception(f"AI fallback failed for '{service.SERVICE_ID}'")
+        return None
+
+    @tasks.loop(seconds=30)
+    async def renew_lease(self):
+        """Acquires or renews the scraper lease, apart from the cycles since a single cycle can outlast its TTL."""
+        await asyncio.to_thread(self.lease.try_acquire)  # The TTL (90s) must be several times the interval
+
+    @tasks.loop(seconds=30)
     async def look_for_free_games(self):
-        free_games = []
-
+        """Scrapes the services if this process is the leader, then broadcasts every game announced since the last cycle."""
         if not self.main_loop:
             return
-        for service in ServiceLoader.services:
-            stored_free_games = self.database.get_free_games_by_service_id(service.SERVICE_ID)
-            try:
-                retrieved_free_games = service.get_free_games()
-            except GameRetrievalException:
-                logger.warning(f"Failed to retrieve data from '{service.SERVICE_ID}', skipping", exc_info=True)
-                continue
-            except InvalidGameDataException:
-                logger.warning(
-                    f"Malformed data from '{service.SERVICE_ID}'"
-                    + (", retrying with AI fallback" if self.llm_parser else ", skipping (no LLM configured)"),
-                    exc_info=True
-                )
-                if self.llm_parser is None:
-                    continue
-                api_request = service.make_request()
-                retrieved_free_games = [GameAdapter.to_object(game) for game in self.llm_parser.to_dict(api_request, service.SERVICE_ID)]
-            except:  # Any unhandled exception in any service would abruptly stop the current iteration without this
-                logger.exception(f"Unexpected error while fetching data from '{service.SERVICE_ID}'")
-                continue
-
-            new_games = [game for game in retrieved_free_games if game not in stored_free_games]
-            expired_games = [game for game in stored_free_games if game not in retrieved_free_games]
-
-            for game in new_games:
-                self.database.create_free_game(game)
-                free_games.append(game)
-                logger.info(f"New free game detected on '{service.SERVICE_ID}': '{game.NAME}'")
-
-            for game in expired_games:
-                self.database.move_to_past_free_games(game)
-                logger.info(f"Game no longer free on '{service.SERVICE_ID}': '{game.NAME}'")
-
-        if free_games:
-            logger.info(f"Cycle complete: {len(free_games)} new free game(s) queued for broadcast")
-        await self.broadcast_free_games(free_games)
-
-    async def broadcast_free_games(self, free_games):
-        if not free_games:
-            return
+        PROFILER.start_cycle()  # Only profiles when armed through '/profile'
+        try:
+            if self.lease.is_leader:  # Kept up to date by 'renew_lease'
+                await self._run_stage(self.scrape_services)
+            await self._run_stage(self.consume_announcements)
+            # Also resumes deliveries interrupted by a restart and retries those which failed transiently
+            await self._run_stage(self.drain_outbox)
+        finally:
+            self.delivery_failures.flush()
+            PROFILER.end_cycle()
+
+    @staticmethod
+    async def _run_stage(stage):
+        """Runs a stage of a cycle. Unhandled errors (e.g. the database being unreachable) would stop the
+           loop for good, so they're logged and the stage runs again next cycle."""
+        try:
+            await stage()
+        except Exception:
+            logger.exception(f"Unexpected error in '{stage.__name__}', it will run again next cycle")
+
+    async def scrape_services(self):
+        """Polls the services that are due according to the scheduler, each one has its own cadence."""
+        free_games = []
 
-        success, fail = 0, 0
-        for guild in self.guilds:
-            guild_config = self.database.get_guild_config(guild)
-            for game in free_games:
-                if guild_config["selected_channel"] and guild_config["services"][game.SERVICE_ID]:
-                    game_embed, thumbnail = self.create_game_embed(game)
-                    mention_content = guild_config.get("mention_role", "")
-                    try:
-                        await guild.get_channel(guild_config["selected_channel"]).send(content=mention_content, embed=game_embed, file=thumbnail)
-                        success += 1
-                    except (AttributeError, discord.errors.Forbidden):  # Invalid channel id or bot lacks permissions
-                        logger.warning(f"Could not deliver '{game.NAME}' to guild '{guild.name}' ({guild.id}): invalid channel or missing permissions")
-                        fail += 1
-                    except:
-                        logger.exception(f"Unexpected error delivering '{game.NAME}' to guild '{guild.name}' ({guild.id})")
-                        fail += 1
+        if not (services := self.scheduler.due(ServiceLoader.services)):
+            return
 
+        # Services are fetched concurrently, so a cycle takes roughly as long as the slowest one
+        start_time = time.perf_counter()
+        with PROFILER.phase("fetch"):
+            results = await asyncio.gather(*(self._fetch_service_games(service) for service in services))
+        logger.debug(f"Fetched {len(services)} service(s) in {time.perf_counter() - start_time:.2f}s")
+
+        detected_at = time.time()
+        expired_games = []
+        with PROFILER.phase("diff"):
+            retrieved = {service: set(games) for service, games in zip(services, results) if games is not None}
+            stored = await asyncio.to_thread(self.database.get_free_games_by_service, [service.SERVICE_ID for service in retrieved])
+            for service, retrieved_free_games in retrieved.items():
+                stored_free_games = stored[service.SERVICE_ID]
+
+                for game in retrieved_free_games - stored_free_games:
+                    free_games.append(game)
+                    logger.info(f"New free game detected on '{service.SERVICE_ID}': '{game.NAME}'")
+
+                for game in stored_free_games - retrieved_free_games:
+                    expired_games.append(game)
+                    logger.info(f"Game no longer free on '{service.SERVICE_ID}': '{game.NAME}'")
+
+        # Enrichment is stored along with the games, so it never has to be fetched again
+        with PROFILER.phase("enrich"):
+            await self.enricher.enrich(free_games)
+        # The lease may have expired and been taken over meanwhile, both leaders would announce the same games
+        if not await asyncio.to_thread(self.lease.is_held):
+            logger.warning("Lost the scraper lease while scraping, the results of this cycle are dropped")
+            return
+        # The whole cycle is persisted with a constant number of round trips. Games are stored before being
+        # announced, and anything stored but not announced (e.g. after a crash) is announced as well
+        with PROFILER.phase("persist"):
+            await asyncio.to_thread(self.database.create_free_games, free_games, detected_at)
+            await asyncio.to_thread(self.database.move_to_past_free_games, expired_games)
+            announced = await asyncio.to_thread(self.database.announce_free_games)
+        # Payloads are only skipped from now on, if anything above failed they are parsed again next time
+        for service in retrieved:
+            service.commit_payload()
+
+        if announced:
+            logger.info(f"Cycle complete: {announced} new free game(s) announced to every cluster")
+
+    async def consume_announcements(self):
+        """Queues the games announced by the leader for the guilds served by this cluster."""
+        # Database calls run on worker threads, so the gateway keeps being served meanwhile
+        announcements = await asyncio.to_thread(self.database.get_announcements_after, self._last_announcement_id)
+        for announcement_id, detected_at, free_games in announcements:
+            deliveries = []  # Structure: [(free_id, guild_id, shard_id, Subscriber, Game), ...]
+            with PROFILER.phase("queue"):
+                for free_id, game in free_games:
+                    for guild_id, subscriber in self.database.subscribers.get_subscribers(game.SERVICE_ID).items():
+                        if guild := self.get_guild(int(guild_id)):
+                            deliveries.append((free_id, guild_id, guild.shard_id, subscriber, game))
+                queued = await asyncio.to_thread(self.outbox.enqueue, deliveries, detected_at)
+            self._last_announcement_id = announcement_id
+            await asyncio.to_thread(self.database.save_announcement_cursor, self._cursor_id, announcement_id)
+            if queued:
+                logger.info(f"Queued {queued} delivery(ies) of {len(free_games)} new free game(s)")
+
+    async def drain_outbox(self):
+        """Claims and sends the due deliveries of the shards run by this process, batch after batch."""
+        batch_size = self.config.OUTBOX_BATCH_SIZE or 500
+        while deliveries := await asyncio.to_thread(self.outbox.claim, list(self.shards), batch_size):
+            with PROFILER.phase("send"):
+                await self.broadcast_deliveries(deliveries)
+
+    async def broadcast_deliveries(self, deliveries):
+        """Sends a batch of claimed deliveries, guilds are visited concurrently."""
+        deliveries_by_guild = {}  # Structure: {guild_id: [Delivery, ...]}
+        for delivery in deliveries:
+            deliveries_by_guild.setdefault(delivery.guild_id, []).append(delivery)
+        guilds, unavailable = [], []
+        for guild_id, guild_deliveries in deliveries_by_guild.items():
+            if guild := self.get_guild(int(guild_id)):
+                guilds.append(guild)
+            else:  # The bot was removed from the guild after the deliveries were queued
+                unavailable.extend((delivery, "guild unavailable") for delivery in guild_deliveries)
+        if unavailable:
+            await asyncio.to_thread(self.outbox.settle, [], unavailable, [])
+
+        # Embeds are rendered once per batch and shared by every guild
+        renders = RenderCache(self.create_game_embed)
+        report = await self.broadcaster.fan_out(
+            guilds,
+            lambda guild: self._deliver_to_guild(guild, deliveries_by_guild[str(guild.id)], renders),
+            min(delivery.detected_at for delivery in deliveries)
+        )
+        renders.clear()
         logger.info(
-            f"Broadcast complete: {success} succeeded, {fail} failed "
-            f"across {len(self.guilds)} guild(s)"
+            f"Broadcast complete: {report.success} succeeded, {report.fail} failed "
+            f"across {len(guilds)} guild(s) ({report.summary()})"
         )
 
+    async def _deliver_to_guild(self, guild, deliveries, renders):
+        """Sends claimed deliveries to a guild and settles them, returns the number of successful and failed messages.
+           Games are packed into as few messages as possible, each one mentioning the role once. Each message
+           is settled as soon as it's sent, so a crash resends at most the message being sent."""
+        success, fail = 0, 0
+        webhook_deleted = False
+        # Deliveries queued by different announcements may have been queued with different guild settings
+        deliveries_by_subscriber = {}  # Structure: {Subscriber: [Delivery, ...]}
+        for delivery in deliveries:
+            deliveries_by_subscriber.setdefault(delivery.subscriber, []).append(delivery)
+
+        for subscriber, subscriber_deliveries in deliveries_by_subscriber.items():
+            rendered, unrenderable = {}, []  # Structure: {delivery_id: (embed, thumbnail_name, thumbnail_bytes)}
+            for delivery in subscriber_deliveries:
+                try:
+                    rendered[delivery.id] = renders.get(delivery.game)
+                except Exception as e:  # Would be claimed again and fail the same way, so it's given up on
+                    self.delivery_failures.add(
+                        "render error",
+                        f"Could not render '{delivery.game.NAME}' for guild '{guild.name}' ({guild.id})",
+                        exc_info=True
+                    )
+                    unrenderable.append((delivery, repr(e)))
+            if unrenderable:
+                await asyncio.to_thread(self.outbox.settle, [], unrenderable, [])
+                fail += 1
+
+            renderable = (delivery for delivery in subscriber_deliveries if delivery.id in rendered)
+            for batch in pack_embeds((rendered[delivery.id][0], delivery) for delivery in renderable):
+                embeds = [embed for embed, _ in batch]
+                batch_deliveries = [delivery for _, delivery in batch]
+                # Games of the same service share their thumbnail, it's only attached once (if it's attached at all)
+                thumbnails = dict(render[1:] for delivery in batch_deliveries if (render := rendered[delivery.id])[1])
+                game_names = ", ".join(f"'{delivery.game.NAME}'" for delivery in batch_deliveries)
+                delivered, failed, retried = [], [], []
+                try:
+                    sent = False
+                    if subscriber.webhook_url and not webhook_deleted:
+                        sent = await self._send_with_webhook(guild, subscriber, embeds, thumbnails)
+                        webhook_deleted = not sent
+                    if not sent:
+                        channel = guild.get_channel(subscriber.channel_id)
+                        await channel.send(content=subscriber.mention_role, embeds=embeds, files=self._make_files(thumbnails))
+                    delivered.extend(batch_deliveries)
+                    success += 1
+                except (AttributeError, discord.errors.Forbidden, discord.errors.NotFound):  # Invalid channel id or bot lacks permissions
+                    self.delivery_failures.add(
+                        "invalid channel or missing permissions",
+                        f"Could not deliver {game_names} to guild '{guild.name}' ({guild.id}): invalid channel or missing permissions"
+                    )
+                    failed.extend((delivery, "invalid channel or missing permissions") for delivery in batch_deliveries)
+                    fail += 1
+                except (discord.errors.DiscordServerError, aiohttp.ClientError, asyncio.TimeoutError) as e:  # Worth retrying later
+                    self.delivery_failures.add(
+                        "transient error (will retry)",
+                        f"Could not deliver {game_names} to guild '{guild.name}' ({guild.id}), will retry: {e!r}"
+                    )
+                    retried.extend((delivery, repr(e)) for delivery in batch_deliveries)
+                    fail += 1
+                except Exception as e:
+                    self.delivery_failures.add(
+                        "unexpected error",
+                        f"Unexpected error delivering {game_names} to guild '{guild.name}' ({guild.id})",
+                        exc_info=True
+                    )
+                    failed.extend((delivery, repr(e)) for delivery in batch_deliveries)
+                    fail += 1
+                await asyncio.to_thread(self.outbox.settle, delivered, failed, retried)
+        return success, fail
+
+    @staticmethod
+    def _make_files(thumbnails):
+        """Turns {filename: bytes} into attachments, which can't be reused once sent."""
+        return [discord.File(io.BytesIO(thumbnail_bytes), filename=filename) for filename, thumbnail_bytes in thumbnails.items()]
+
+    async def _send_with_webhook(self, guild, subscriber, embeds, thumbnails):
+        """Sends a message through the webhook of a guild, which has its own rate limit bucket instead of
+           sharing the bot's global one. Returns False if the webhook was deleted, in which case it's
+           removed from the guild config and the message must be sent by the bot itself."""
+        webhook = discord.Webhook.from_url(subscriber.webhook_url, session=self.http_session)
+        try:
+            await webhook.send(
+                content=subscriber.mention_role,
+                embeds=embeds,
+                files=self._make_files(thumbnails),
+                username=self.user.name,
+                avatar_url=self.user.display_avatar.url
+            )
+            return True
+        except discord.errors.NotFound:
+            logger.info(f"Webhook of guild '{guild.name}' ({guild.id}) no longer exists, falling back to bot delivery")
+            await asyncio.to_thread(self.database.update_guild_config, guild, {"webhook_url": None})
+            return False
 
     async def is_invoked(self, interaction: discord.Interaction):
         logger.debug(
@@ -202,9 +509,10 @@ class AutomatikBot(commands.Bot):
 if __name__ == "__main__":
     automatik.utils.cli.clear_console()
     automatik.utils.cli.print_ascii_art()
+    bot_config = Config(".env")
+    setup_logging(bot_config)
     logger.info("Starting...")
-    automatik_bot = AutomatikBot(command_prefix="!mk ", intents=discord.Intents.default())
-    automatik.utils.update.check_updates()
+    automatik_bot = AutomatikBot(command_prefix="!mk ", intents=discord.Intents.default(), config=bot_config)
     try:
         automatik_bot.run(automatik_bot.config.discord_token, log_handler=None)
     except discord.errors.LoginFailure:
@@ -4,6 +4,23 @@ from discord import ui
 from automatik import logger
 
 
+async def get_webhook_url(channel):
+    """Returns the URL of the bot's webhook in a channel, which is created if missing.
+       Webhook delivery is optional, None is returned when the bot isn't allowed to manage webhooks."""
+    bot_member = channel.guild.me
+    if not channel.permissions_for(bot_member).manage_webhooks:
+        return None
+    try:
+        for webhook in await channel.webhooks():
+            if webhook.user and webhook.user.id == bot_member.id and webhook.token:
+                return webhook.url
+        webhook = await channel.create_webhook(name=bot_member.name, reason="Free game notifications")
+        return webhook.url
+    except discord.HTTPException:
+        logger.warning(f"Could not set up a webhook in {channel.name} ({channel.guild.name}), falling back to bot delivery")
+        return None
+
+
 class ChannelSelector(ui.Select):
     def __init__(self, channels, languages, database, guild):
         self.languages = languages
@@ -32,12 +49,15 @@ class ChannelSelector(ui.Select):
         channel_id = int(self.values[0])
         channel = self.guild.get_channel(channel_id)
 
-        self.database.update_guild_config(self.guild, {"selected_channel": channel_id})
-        await interaction.response.send_message(
+        # Acknowledged first, looking up or creating the webhook may take longer than the interaction allows
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        webhook_url = await get_webhook_url(channel)
+        self.database.update_guild_config(self.guild, {"selected_channel": channel_id, "webhook_url": webhook_url})
+        await interaction.followup.send(
             self.languages.get_message(guild_lang, "select_success").format(channel.mention),
             ephemeral=True
         )
-        logger.info(f"Channel selected: {channel.name} in {self.guild.name}")
+        logger.info(f"Channel selected: {channel.name} in {self.guild.name} ({'webhook' if webhook_url else 'bot'} delivery)")
 
 
 class ChannelManagementView(ui.View):
@@ -68,7 +88,7 @@ class ChannelManagementView(ui.View):
 
     async def unselect_channel(self, interaction):
         guild_lang = self.database.get_guild_config(self.guild)["lang"]
-        self.database.update_guild_config(self.guild, {"selected_channel": None})
+        self.database.update_guild_config(self.guild, {"selected_channel": None, "webhook_url": None})
         await interaction.response.send_message(
             self.languages.get_message(guild_lang, "unselect_success").format(self.channel_id),
             ephemeral=True
@@ -2,6 +2,7 @@ from discord import app_commands
 from discord.ext import commands
 
 from automatik import logger
+from automatik.core.profiler import PROFILER
 
 
 class OwnerSlash(commands.Cog):
@@ -36,3 +37,19 @@ class OwnerSlash(commands.Cog):
             logger.exception("Reload failed with an unexpected error")
         finally:
             self.bot.main_loop = bool(was_started)
+
+    @app_commands.command()
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(seconds="Profile every cycle for this many seconds instead of just the next one")
+    async def profile(self, interaction, seconds: app_commands.Range[int, 0, 3600] = 0):
+        """Profiles the next cycle, or every cycle within a time window, and writes the report to the logs."""
+        guild_lang = self.database.get_guild_config(interaction.guild)["lang"]
+
+        PROFILER.arm(seconds)
+        logger.info(
+            f"Profiler armed for {f'{seconds}s' if seconds else 'the next cycle'} by {interaction.user} "
+            f"({interaction.user.id}) from guild '{interaction.guild.name}' ({interaction.guild.id})"
+        )
+        message = "profiler_armed_window" if seconds else "profiler_armed_cycle"
+        await interaction.response.send_message(self.languages.get_message(guild_lang, message).format(seconds))
@@ -1,13 +1,32 @@
 from abc import ABC, abstractmethod
 from typing import List
+import asyncio
+import hashlib
 import sys
+import time
+from datetime import datetime
 
 from requests import Request
 
+from automatik import logger
+from automatik.core import metrics
+from automatik.core.errors import InvalidGameDataException
 from automatik.core.game import Game
+from automatik.core.profiler import PROFILER
 
 
 class BaseService(ABC):
+    FETCH_TIMEOUT = 60  # Seconds a service has to return its games before the cycle moves on without it
+    POLL_INTERVAL = 15 * 60  # Seconds between polls, unless 'get_poll_interval' says otherwise
+
+    def __init__(self):
+        self._validators = {}  # ETag and Last-Modified headers of the last parsed response
+        self._payload_hash = None
+        self._payload_size = 0
+        self._pending_payload = None  # (hash, size, validators) of the last parsed response, until committed
+        self.skipped_payloads = 0  # Responses which were not parsed because nothing changed
+        self.saved_bytes = 0  # Bytes which were either not downloaded (304) or not parsed (identical payload)
+
     @property
     @abstractmethod
     def SERVICE_NAME(self):
@@ -27,11 +46,77 @@ class BaseService(ABC):
     def SERVICE_IMAGE(self):
         pass
 
+    def get_poll_interval(self, now: datetime) -> float:
+        """Returns the seconds to wait before the next poll, 'now' being an aware UTC datetime.
+           Services with predictable promotion changes can shorten it around them."""
+        return self.POLL_INTERVAL
+
+    def setup(self, database):
+        """Called once the service is loaded, lets it acquire resources such as persistent caches."""
+        pass
+
     @abstractmethod
     def make_request(self) -> Request:
         """Makes the HTTP request to the service's backend."""
         pass
 
     @abstractmethod
-    def get_free_games(self) -> List[Game]:
-        pass
\ No newline at end of file
+    def get_free_games(self) -> List[Game] | None:
+        """Returns the games currently free on the service, or None if they didn't change since the last call."""
+        pass
+
+    async def get_free_games_async(self) -> List[Game] | None:
+        """Async variant of 'get_free_games'. Services built on blocking HTTP clients don't need to
+           override it, their sync implementation is run on a worker thread instead."""
+        return await asyncio.to_thread(PROFILER.wrap(self.get_free_games))
+
+    def _conditional_headers(self):
+        """Returns the headers which allow the backend to answer '304 Not Modified' if nothing changed."""
+        headers = {}
+        if self._validators.get("ETag"):
+            headers["If-None-Match"] = self._validators["ETag"]
+        if self._validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = self._validators["Last-Modified"]
+        return headers
+
+    def commit_payload(self):
+        """Remembers the last parsed response, so that it's skipped from now on while it doesn't change.
+           Called once its games are stored, a response whose games were lost (e.g. the fetch timed out
+           or storing them failed) is parsed again on the next poll."""
+        if self._pending_payload is not None:
+            self._payload_hash, self._payload_size, self._validators = self._pending_payload
+            self._pending_payload = None
+
+    def _process_if_changed(self, response) -> List[Game] | None:
+        """Parses a response through '_process_request' unless it's identical to the last one committed."""
+        if response.status_code == 304:
+            saved_bytes, reason = self._payload_size, "304 Not Modified"
+        elif (payload_hash := hashlib.sha256(response.content).hexdigest()) == self._payload_hash:
+            saved_bytes, reason = len(response.content), "identical payload"
+        else:
+            metrics.SERVICE_PAYLOAD_BYTES.set(len(response.content), service=self.SERVICE_ID)
+            start_time = time.perf_counter()
+            try:
+                with PROFILER.phase("parse"):
+                    games = self._process_request(response)
+            except InvalidGameDataException as e:
+                e.raw_data = response  # Lets the AI fallback reuse the payload instead of downloading it again
+                raise
+            finally:
+                metrics.SERVICE_PARSE_SECONDS.observe(time.perf_counter() - start_time, service=self.SERVICE_ID)
+            # Only remembered after a successful parse, so broken payloads are processed again next time
+            self._pending_payload = (
+                payload_hash,
+                len(response.content),
+                {header: response.headers.get(header) for header in ("ETag", "Last-Modified")}
+            )
+            return games
+
+        self.skipped_payloads += 1
+        metrics.SERVICE_SKIPPED_PAYLOADS.inc(service=self.SERVICE_ID)
+        self.saved_bytes += saved_bytes
+        logger.debug(
+            f"'{self.SERVICE_ID}' unchanged ({reason}), skipped {saved_bytes} bytes "
+            f"({self.skipped_payloads} payload(s) and {self.saved_bytes} bytes skipped so far)"
+        )
+        return None
@@ -0,0 +1,141 @@
+import asyncio
+import statistics
+import time
+
+from automatik import logger
+from automatik.core import metrics
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000  # Titles, descriptions, fields, footers and authors of every embed combined
+
+
+def pack_embeds(entries):
+    """Groups (embed, value) pairs into as few messages as Discord allows, returns a list of lists of pairs."""
+    batches, batch, batch_chars = [], [], 0
+    for embed, value in entries:
+        if batch and (len(batch) == MAX_EMBEDS_PER_MESSAGE or batch_chars + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE):
+            batches.append(batch)
+            batch, batch_chars = [], 0
+        batch.append((embed, value))
+        batch_chars += len(embed)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class BroadcastReport:
+    """Outcome of a fan-out. Successes and failures are counted per message, latencies per guild."""
+
+    def __init__(self, detected_at):
+        """'detected_at' is a Unix timestamp, so it can come from another process (see 'Database.announce_free_games')."""
+        self.success = 0
+        self.fail = 0
+        self.latencies = []
+        self._detected_at = detected_at
+        self._last_delivery_at = detected_at
+
+    def record(self, success, fail, started_at):
+        self.success += success
+        self.fail += fail
+        self.latencies.append(latency := time.perf_counter() - started_at)
+        metrics.BROADCAST_GUILD_SECONDS.observe(latency)
+        metrics.BROADCAST_MESSAGES.inc(success, outcome="success")
+        metrics.BROADCAST_MESSAGES.inc(fail, outcome="failure")
+        self._last_delivery_at = max(self._last_delivery_at, time.time())
+
+    @property
+    def total_time(self):
+        """Seconds elapsed between the detection of the games and the last delivery."""
+        return self._last_delivery_at - self._detected_at
+
+    def summary(self):
+        if not self.latencies:
+            return "no deliveries attempted"
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return (
+            f"guild latency median {statistics.median(latencies):.2f}s, p95 {p95:.2f}s, max {latencies[-1]:.2f}s; "
+            f"{self.total_time:.2f}s from detection to last delivery"
+        )
+
+
+class Broadcaster:
+    """Delivers notifications to many guilds at once while capping the number of in-flight deliveries.
+
+    Discord's per-route and global rate limit buckets are already enforced by the HTTP client of
+    discord.py, which holds back requests until their bucket frees up. The concurrency limit keeps
+    that backlog short so a large fan-out neither floods the client nor starves interactive commands.
+    """
+
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+
+    async def fan_out(self, targets, deliver, detected_at=None):
+        """Awaits 'deliver(target)' for every target, which must return its (success, fail) message counts."""
+        report = BroadcastReport(time.time() if detected_at is None else detected_at)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(target):
+            async with semaphore:
+                started_at = time.perf_counter()
+                success, fail = await deliver(target)
+                if success or fail:  # Targets which had nothing to receive would skew the latencies
+                    report.record(success, fail, started_at)
+                    logger.debug(f"Delivered to {target} in {time.perf_counter() - started_at:.2f}s")
+
+        await asyncio.gather(*(run(target) for target in targets))
+        if report.latencies:
+            metrics.BROADCAST_SECONDS.observe(report.total_time)
+        return report
+
+
+class FailureDigest:
+    """Rolls the delivery failures of a cycle up into a single summary record.
+
+    Failing for thousands of guilds would otherwise log thousands of lines, only the first 'sample_size'
+    failures are logged individually and the rest are just counted by reason.
+    """
+
+    def __init__(self, sample_size=5):
+        self.sample_size = sample_size
+        self._counts = {}  # Structure: {reason: failures}
+        self._total = 0
+
+    def add(self, reason, message, exc_info=False):
+        self._counts[reason] = self._counts.get(reason, 0) + 1
+        self._total += 1
+        if self._total <= self.sample_size:
+            logger.warning(message, exc_info=exc_info)
+
+    def flush(self):
+        """Logs the summary of the failures added since the last flush, if any."""
+        if not self._total:
+            return
+        reasons = ", ".join(f"{count} {reason}" for reason, count in sorted(self._counts.items(), key=lambda item: -item[1]))
+        logger.warning(
+            f"{self._total} delivery failure(s) this cycle: {reasons}"
+            + (f" ({self._total - self.sample_size} not logged individually)" if self._total > self.sample_size else "")
+        )
+        self._counts = {}
+        self._total = 0
+
+
+class RenderCache:
+    """Memoizes rendered games for the duration of a single broadcast, so every guild shares one render.
+
+    Extra arguments given to 'get' (e.g. the guild's language) are forwarded to the render
+    function and become part of the cache key.
+    """
+
+    def __init__(self, render):
+        self._render = render
+        self._renders = {}
+
+    def get(self, game, *args):
+        key = (game.SERVICE_ID, game.LINK, *args)
+        if key not in self._renders:
+            self._renders[key] = self._render(game, *args)
+        return self._renders[key]
+
+    def clear(self):
+        self._renders.clear()
@@ -0,0 +1,96 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+from pymongo import UpdateOne
+
+
+class LRUCache:
+    """Bounded in-memory cache which evicts the least recently used entry once full.
+
+    Entries older than 'ttl' seconds are treated as missing, a 'ttl' of None keeps them forever.
+    It is safe to use from several threads, e.g. when invalidations come from a background watcher.
+    """
+
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # Structure: {key: (expires_at, value)}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._entries[key]
+            except KeyError:
+                return default
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Stores an entry, 'ttl' overrides the default lifetime of the cache."""
+        ttl = ttl or self.ttl
+        with self._lock:
+            self._entries[key] = (None if ttl is None else time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_many(self, keys):
+        """Returns a {key: value} dict with the keys found in the cache."""
+        return {key: value for key in keys if (value := self.get(key)) is not None}
+
+    def set_many(self, entries, ttl=None):
+        for key, value in entries.items():
+            self.set(key, value, ttl)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PersistentCache:
+    """Cache stored in a MongoDB collection, so it survives restarts. It offers the same 'get_many' and
+       'set_many' methods as 'LRUCache'. Expired entries are ignored and purged later by a TTL index."""
+
+    def __init__(self, collection, ttl):
+        self.ttl = ttl
+        self._collection = collection
+        self._collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def get_many(self, keys):
+        """Returns a {key: value} dict with the keys found in the cache."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        documents = self._collection.find({"_id": {"$in": list(keys)}, "expires_at": {"$gt": now}})
+        return {document["_id"]: document["value"] for document in documents}
+
+    def set_many(self, entries, ttl=None):
+        """Stores several entries at once, 'ttl' overrides the default lifetime of the cache."""
+        if not entries:
+            return
+        expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=ttl or self.ttl)
+        self._collection.bulk_write([
+            UpdateOne({"_id": key}, {"$set": {"value": value, "expires_at": expires_at}}, upsert=True)
+            for key, value in entries.items()
+        ], ordered=False)
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl)
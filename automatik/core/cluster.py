@@ -0,0 +1,77 @@
+import datetime
+import os
+import socket
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from automatik import logger
+from automatik.core import metrics
+
+
+def default_holder_id():
+    """Identifies this process among every cluster connected to the same database."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderLease:
+    """Lease stored in a MongoDB document which elects the single process allowed to scrape services.
+
+    The holder has to renew the lease before it expires, otherwise any other process can take it over.
+    Acquiring and renewing are the same atomic 'find_one_and_update': it only matches the lease when it
+    is free, expired or already ours, and when it doesn't match the upsert collides with the existing
+    document, which means someone else holds it.
+    """
+
+    def __init__(self, collection, holder, ttl=90, lease_id="scraper"):
+        self._collection = collection
+        self.holder = holder
+        self.ttl = ttl
+        self.lease_id = lease_id
+        self.is_leader = False
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="lease_try_acquire")
+    def try_acquire(self):
+        """Acquires or renews the lease, returns whether this process is the leader afterwards."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            self._collection.find_one_and_update(
+                {"_id": self.lease_id, "$or": [{"holder": self.holder}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"holder": self.holder, "expires_at": now + datetime.timedelta(seconds=self.ttl)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            is_leader = True
+        except DuplicateKeyError:  # Held by another process
+            is_leader = False
+        except PyMongoError:  # The lease can't be renewed, so it may already belong to someone else
+            logger.exception("Could not renew the scraper lease")
+            is_leader = False
+
+        if is_leader != self.is_leader:
+            logger.info(f"'{self.holder}' {'is now' if is_leader else 'is no longer'} the scraper leader")
+        self.is_leader = is_leader
+        return is_leader
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="lease_is_held")
+    def is_held(self):
+        """Checks the lease document itself rather than the outcome of the last renewal, meant to fence the
+           writes only the leader may do. Returns False if the lease can't be checked."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            held = self._collection.find_one(
+                {"_id": self.lease_id, "holder": self.holder, "expires_at": {"$gt": now}}, {"_id": 1}
+            ) is not None
+        except PyMongoError:
+            logger.exception("Could not check the scraper lease")
+            held = False
+        if not held and self.is_leader:
+            logger.info(f"'{self.holder}' is no longer the scraper leader")
+            self.is_leader = False
+        return held
+
+    def release(self):
+        """Gives the lease up so another process can take over without waiting for it to expire."""
+        if self.is_leader:
+            self._collection.delete_one({"_id": self.lease_id, "holder": self.holder})
+            self.is_leader = False
@@ -12,7 +12,10 @@ class Config:
     def __getattr__(self, attr):
         attr = attr.upper()
         try:
-            return ast.literal_eval(self._config[attr])
+            value = self._config[attr]
+            if value.strip().lower() in ("true", "false"):  # .env files are usually written in lowercase
+                return value.strip().lower() == "true"
+            return ast.literal_eval(value)
         except (ValueError, SyntaxError):
             return self._config[attr]
         except KeyError:
@@ -1,20 +1,35 @@
+import copy
 import datetime
+import threading
 
 import pymongo
-from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
 
 from automatik import logger
+from automatik.core import metrics
+from automatik.core.cache import LRUCache, PersistentCache
+from automatik.core.cluster import LeaderLease
 from automatik.core.game import GameAdapter
+from automatik.core.outbox import DeliveryOutbox
 from automatik.core.services import ServiceLoader
+from automatik.core.subscribers import SubscriberIndex
 
 
 class Database:
-    def __init__(self, uri):
+    ANNOUNCEMENT_TTL = 24 * 60 * 60  # Clusters which are down for longer than this miss the announcements
+
+    def __init__(self, uri, config_cache_size=10000, config_cache_ttl=3600):
         self._db = pymongo.MongoClient(host=uri)["automatik"]
+        self._db["announcements"].create_index("created_at", expireAfterSeconds=self.ANNOUNCEMENT_TTL)
+        self._config_cache = LRUCache(config_cache_size, config_cache_ttl)  # Structure: {guild_id: config}
+        self.subscribers = SubscriberIndex()
         self.CONFIG_TEMPLATE = {
             "_id": None,
             "name": None,
             "selected_channel": None,  # Structure: <#1234>
+            "webhook_url": None,  # Webhook of the selected channel, only when the bot can manage webhooks
             "mention_role": None,  # Structure: <@&1234>
             "lang": "en",
             "services": {},  # Services are represented by their SERVICE_IDs
@@ -22,44 +37,174 @@ class Database:
         }
 
     def _create_guild_config(self, guild):
-        """Creates a new document in the 'configs' collection."""
+        """Creates a new document in the 'configs' collection and returns it."""
         config = dict(self.CONFIG_TEMPLATE)
         config.update({"_id": str(guild.id), "name": guild.name, "services": dict.fromkeys(ServiceLoader.get_service_ids(), True)})
         try:
             self._db["configs"].insert_one(config)
-        except DuplicateKeyError:
-            pass
+        except DuplicateKeyError:  # Created concurrently by someone else
+            return self._db["configs"].find_one({"_id": str(guild.id)})
+        return config
 
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="insert_missing_or_new_services")
     def insert_missing_or_new_services(self):
         """Inserts fields into the 'services' object of each document from the 'configs' collection."""
         for service in ServiceLoader.get_service_ids():
             self._db["configs"].update_many({f"services.{service}": {"$exists": False}},
                                             {"$set": {f"services.{service}": True}})
+        self._config_cache.clear()
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="load_subscribers")
+    def load_subscribers(self):
+        """Builds the service to subscriber index from a single projected query over the 'configs' collection."""
+        configs = self._db["configs"].find(
+            {"selected_channel": {"$ne": None}},
+            {"selected_channel": 1, "mention_role": 1, "webhook_url": 1, "services": 1}
+        )
+        self.subscribers.rebuild(configs)
+        logger.info(f"Subscriber index built: {len(self.subscribers)} guild(s) receiving notifications")
 
     def get_guild_config(self, guild):
-        """Returns the configuration from a guild, creates said config if it didn't already exist."""
-        self._create_guild_config(guild)  # This might be removed in the future to improve scalability
-        return self._db["configs"].find_one({"_id": str(guild.id)})
+        """Returns the configuration from a guild, creates said config if it didn't already exist.
+           Configs are served from an in-memory cache, so the returned dict is a copy safe to modify."""
+        guild_id = str(guild.id)
+        if (config := self._config_cache.get(guild_id)) is None:
+            config = self._db["configs"].find_one({"_id": guild_id}) or self._create_guild_config(guild)
+            self._config_cache.set(guild_id, config)
+        return copy.deepcopy(config)
 
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="update_guild_config")
     def update_guild_config(self, guild, update):
-        """Updates the value of a determined field."""
-        self._db["configs"].update_one({"_id": str(guild.id)}, {"$set": update})
-
-    def create_free_game(self, game_obj):
-        """Creates a new document in the 'free_games' collection."""
-        self._db["free_games"].insert_one(GameAdapter.to_dict(game_obj))
-        logger.debug(f"Inserted free game '{game_obj.NAME}' ({game_obj.SERVICE_ID}) into 'free_games'")
-
-    def get_free_games_by_service_id(self, service_id):
-        """Returns every document from the 'free_games' collection with a certain service ID."""
-        free_games = []
-        for game_dict in self._db["free_games"].find({"service_id": service_id}):
-            free_games.append(GameAdapter.to_object(game_dict))
+        """Updates the value of a determined field. Dotted field paths are supported, as in MongoDB."""
+        guild_id = str(guild.id)
+        self._db["configs"].update_one({"_id": guild_id}, {"$set": update})
+        if (config := self._config_cache.get(guild_id)) is not None:  # Write-through
+            for path, value in update.items():
+                *parents, field = path.split(".")
+                target = config
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[field] = value
+        else:
+            config = self.get_guild_config(guild)
+        self.subscribers.update(config)
+
+    def watch_guild_configs(self):
+        """Drops cached configs and reindexes subscribers as soon as they're modified elsewhere (e.g. another
+           bot process or a manual edit), instead of waiting for them to expire. Requires a replica set."""
+        threading.Thread(target=self._watch_guild_configs, name="configs-watcher", daemon=True).start()
+
+    def _watch_guild_configs(self):
+        try:
+            with self._db["configs"].watch(full_document="updateLookup") as change_stream:
+                for change in change_stream:
+                    guild_id = change["documentKey"]["_id"]
+                    self._config_cache.pop(guild_id)
+                    if change.get("fullDocument"):
+                        self.subscribers.update(change["fullDocument"])
+                    elif change["operationType"] == "delete":
+                        self.subscribers.remove(guild_id)
+        except PyMongoError:
+            logger.exception("Guild config change stream closed, cached configs will only expire by TTL from now on")
+
+    def get_cache(self, name, ttl):
+        """Returns a cache persisted in the '<name>_cache' collection whose entries expire after 'ttl' seconds."""
+        return PersistentCache(self._db[f"{name}_cache"], ttl)
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="create_free_games")
+    def create_free_games(self, games, detected_at):
+        """Creates a document in the 'free_games' collection for each game using a single bulk write.
+           Upserts are used so that inserting a game which is already stored has no effect. Games are
+           stored as not announced yet, see 'announce_free_games'."""
+        if not games:
+            return
+        self._db["free_games"].bulk_write([
+            UpdateOne({"link": game.LINK, "service_id": game.SERVICE_ID},
+                      {"$setOnInsert": {**GameAdapter.to_dict(game), "detected_at": detected_at, "announced": False}},
+                      upsert=True)
+            for game in games
+        ], ordered=False)
+        logger.debug(f"Inserted {len(games)} free game(s) into 'free_games'")
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="get_free_games_by_service")
+    def get_free_games_by_service(self, service_ids):
+        """Returns a {service_id: {Game, ...}} dict with the 'free_games' documents of several services at once."""
+        free_games = {service_id: set() for service_id in service_ids}
+        for game_dict in self._db["free_games"].find({"service_id": {"$in": list(service_ids)}}):
+            free_games[game_dict["service_id"]].add(GameAdapter.to_object(game_dict))
         return free_games
 
-    def move_to_past_free_games(self, game_obj):
-        """Moves a document from the 'free_games' collection to 'past_free_games' collection."""
-        past_free_game_dict = self._db["free_games"].find_one_and_delete({"link": game_obj.LINK,
-                                                                          "service_id": game_obj.SERVICE_ID})
-        self._db["past_free_games"].insert_one(past_free_game_dict)
-        logger.debug(f"Moved '{game_obj.NAME}' ({game_obj.SERVICE_ID}) from 'free_games' to 'past_free_games'")
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="move_to_past_free_games")
+    def move_to_past_free_games(self, games):
+        """Moves documents from the 'free_games' collection to the 'past_free_games' collection.
+           Documents are first merged into 'past_free_games' by their '_id' and deleted afterwards, so
+           the move costs two round trips and a crash between both steps is repaired by the next call."""
+        if not games:
+            return
+        match = {"$or": [{"link": game.LINK, "service_id": game.SERVICE_ID} for game in games]}
+        self._db["free_games"].aggregate([
+            {"$match": match},
+            {"$merge": {"into": "past_free_games", "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+        self._db["free_games"].delete_many(match)
+        logger.debug(f"Moved {len(games)} game(s) from 'free_games' to 'past_free_games'")
+
+    def get_leader_lease(self, holder, ttl):
+        """Returns the lease stored in the 'leases' collection which elects the scraping process."""
+        return LeaderLease(self._db["leases"], holder, ttl)
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="announce_free_games")
+    def announce_free_games(self):
+        """Hands the stored games which weren't announced yet over to every cluster through the 'announcements'
+           collection, returns how many were announced.
+           Games are only flagged as announced once the announcement is published, so a crash in between
+           announces them again on the next call. Each game carries the '_id' of its 'free_games' document,
+           which identifies the free period and keys its deliveries, so a game announced twice is still
+           sent once, while a game which becomes free again gets a new document and is sent again."""
+        documents = list(self._db["free_games"].find({"announced": False}))
+        if not documents:
+            return 0
+        self._db["announcements"].insert_one({
+            "games": [{**GameAdapter.to_dict(GameAdapter.to_object(document)), "free_id": document["_id"]}
+                      for document in documents],
+            # Unix timestamp of the detection, used to measure the broadcast latency
+            "detected_at": min(document["detected_at"] for document in documents),
+            "created_at": datetime.datetime.now(datetime.timezone.utc)
+        })
+        self._db["free_games"].update_many(
+            {"_id": {"$in": [document["_id"] for document in documents]}}, {"$set": {"announced": True}}
+        )
+        return len(documents)
+
+    @staticmethod
+    def get_announcement_id_at(timestamp):
+        """Returns an announcement '_id' lower than those of every announcement published after 'timestamp'."""
+        return ObjectId.from_datetime(datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc))
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="get_announcement_cursor")
+    def get_announcement_cursor(self, cluster_id):
+        """Returns the '_id' of the last announcement consumed by a cluster, or None if it never consumed any."""
+        cursor = self._db["announcement_cursors"].find_one({"_id": cluster_id})
+        return cursor["announcement_id"] if cursor else None
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="save_announcement_cursor")
+    def save_announcement_cursor(self, cluster_id, announcement_id):
+        """Stores the last announcement consumed by a cluster, the cursor never moves backwards."""
+        self._db["announcement_cursors"].update_one(
+            {"_id": cluster_id}, {"$max": {"announcement_id": announcement_id}}, upsert=True
+        )
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="get_announcements_after")
+    def get_announcements_after(self, announcement_id):
+        """Returns the announcements published after the given one as [(_id, detected_at, [(free_id, Game), ...]), ...]."""
+        return [
+            (announcement["_id"], announcement["detected_at"], [
+                # Announcements published before free ids existed are keyed on themselves
+                (game.get("free_id", announcement["_id"]), GameAdapter.to_object(game)) for game in announcement["games"]
+            ])
+            for announcement in self._db["announcements"].find({"_id": {"$gt": announcement_id}}).sort("_id", pymongo.ASCENDING)
+        ]
+
+    def get_outbox(self):
+        """Returns the durable queue of notifications stored in the 'deliveries' collection."""
+        return DeliveryOutbox(self._db["deliveries"])
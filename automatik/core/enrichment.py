@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime
+
+from curl_cffi.requests import AsyncSession
+
+from automatik import logger
+from automatik.utils.html_parsing import find_meta_content
+
+
+class GameEnricher:
+    """Completes newly detected games with their promo image and IGDB metadata.
+
+    It runs once per game, right before the game is stored, so the enrichment is persisted along with
+    it and neither broadcasts nor restarts have to scrape store pages or query IGDB again.
+    """
+    _page_timeout = 15
+    _max_head_size = 1024 * 1024  # Pages whose '<head>' is bigger than this are given up on
+
+    def __init__(self, igdb=None, concurrency=8):
+        self.igdb = igdb
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def enrich(self, games):
+        if not games:
+            return
+        async with AsyncSession(impersonate="chrome") as session:
+            igdb_data, image_urls = await asyncio.gather(
+                self.igdb.get_games_data([game.NAME for game in games]) if self.igdb else asyncio.sleep(0),
+                asyncio.gather(*(self._get_promo_img_url(session, game) for game in games))
+            )
+        igdb_data = igdb_data or {}
+
+        for game, image_url in zip(games, image_urls):
+            game.IMAGE_URL = image_url
+            if data := igdb_data.get(game.NAME):
+                game.SUMMARY = data.get("summary")
+                game.GENRES = [genre["name"] for genre in data.get("genres", [])]
+                if data.get("first_release_date"):
+                    game.RELEASE_YEAR = datetime.fromtimestamp(data["first_release_date"]).year
+        logger.debug(f"Enriched {len(games)} game(s)")
+
+    async def _get_promo_img_url(self, session, game):
+        """Returns the 'og:image' of a store page. Only the '<head>' is downloaded, the rest is never read."""
+        head = b""
+        try:
+            async with self._semaphore, session.stream("GET", game.LINK, timeout=self._page_timeout) as response:
+                async for chunk in response.aiter_content():
+                    head += chunk
+                    if b"</head>" in head[-len(chunk) - 7:] or len(head) > self._max_head_size:
+                        break
+                # Aborts the transfer, otherwise leaving the stream waits for the rest of the body to arrive
+                if response.quit_now:
+                    response.quit_now.set()
+            # Parsed within the 'try' too, a failed lookup must never stop the cycle
+            return find_meta_content(head, "og:image") if head else None
+        except Exception as e:
+            logger.warning(f"Could not retrieve the promo image of '{game.NAME}' ({game.LINK}): {e}")
+        return None
@@ -12,5 +12,6 @@ class InvalidGameDataException(Exception):
        to parse the retrieved data and its output must be ignored by the bot."""
     def __init__(self, cause: Exception):
         self.message = "An error occurred while parsing game data."
+        self.raw_data = None  # Response which couldn't be parsed, if the service kept it
         self.__cause__ = cause
         super().__init__(self.message)
@@ -1,26 +1,31 @@
 import datetime
 
-from curl_cffi import requests
-from bs4 import BeautifulSoup
-
 
 class Game:
-    def __init__(self, name, link, service_id, date=None):
+    __slots__ = ("NAME", "LINK", "SERVICE_ID", "DATE", "IMAGE_URL", "SUMMARY", "GENRES", "RELEASE_YEAR")
+
+    def __init__(self, name, link, service_id, date=None, image_url=None, summary=None, genres=None, release_year=None):
         self.NAME = name
         self.LINK = link
         self.SERVICE_ID = service_id  # Service ID of the service which generated the instance
         self.DATE = str(datetime.datetime.now()) if date is None else date
+        # Enrichment, filled in once when the game is first detected (see 'GameEnricher')
+        self.IMAGE_URL = image_url
+        self.SUMMARY = summary
+        self.GENRES = genres or []
+        self.RELEASE_YEAR = release_year
 
     def __eq__(self, other):
         """When comparing two Game objects only the link and service ID attributes will matter."""
+        if not isinstance(other, Game):
+            return NotImplemented
         return self.LINK == other.LINK and self.SERVICE_ID == other.SERVICE_ID
 
-    @property
-    def promo_img_url(self):
-        response = requests.get(self.LINK, impersonate="chrome")
-        bs4 = BeautifulSoup(response.content, "html.parser")
-        img_tag = bs4.find("meta", property="og:image")
-        return img_tag["content"] if img_tag else None
+    def __hash__(self):
+        return hash((self.SERVICE_ID, self.LINK))
+
+    def __repr__(self):
+        return f"Game({self.NAME!r}, {self.LINK!r}, {self.SERVICE_ID!r})"
 
 
 class GameAdapter:
@@ -30,7 +35,11 @@ class GameAdapter:
         return {"name": game.NAME,
                 "link": game.LINK,
                 "service_id": game.SERVICE_ID,
-                "date": game.DATE}
+                "date": game.DATE,
+                "image_url": game.IMAGE_URL,
+                "summary": game.SUMMARY,
+                "genres": game.GENRES,
+                "release_year": game.RELEASE_YEAR}
 
     @staticmethod
     def to_object(game_dict):
@@ -38,4 +47,6 @@ class GameAdapter:
         if game_dict.get("date") is None:
             game_dict["date"] = str(datetime.datetime.now())
         return Game(name=game_dict["name"], link=game_dict["link"],
-                    service_id=game_dict["service_id"], date=game_dict["date"])
+                    service_id=game_dict["service_id"], date=game_dict["date"],
+                    image_url=game_dict.get("image_url"), summary=game_dict.get("summary"),
+                    genres=game_dict.get("genres"), release_year=game_dict.get("release_year"))
@@ -1,9 +1,17 @@
+import asyncio
+import hashlib
 import json
 import os
+import re
+import time
 
-from agno.agent import Agent
+from bs4 import Comment
 from curl_cffi.requests import Response
 
+from automatik import logger
+from automatik.core import metrics
+from automatik.utils.html_parsing import parse_html
+
 
 class LLMParser:
     _prompt = (
@@ -21,11 +29,31 @@ class LLMParser:
         "google": "GOOGLE_API_KEY",
         "openai": "OPENAI_API_KEY",
     }
+    _max_payload_tokens = 30000
+    _chars_per_token = 4  # Rough estimate, only used to keep prompts within budget
+    # JSON keys with a word starting like any of these never hold what the model is asked for
+    _irrelevant_keys = ("image", "thumbnail", "screenshot", "video", "description", "tag", "categor", "rating",
+                        "review", "seller", "developer", "publisher", "attribute", "platform", "locale", "icon")
+    _irrelevant_tags = ("head", "script", "style", "noscript", "svg", "iframe", "img", "picture", "link", "meta")
+    _kept_attributes = ("href", "class", "title")
 
-    def __init__(self, llm_model: str, llm_api_key: str | None = None):
+    def __init__(self, llm_model: str, llm_api_key: str | None = None, cache=None, timeout=120):
         llm_provider = llm_model.split(":", 1)[0]
         LLMParser._apply_env(llm_provider, llm_api_key)
-        self._agent = Agent(model=llm_model)
+        self.llm_model = llm_model
+        self._agent = None  # Created on first use, see 'get_agent'
+        self._cache = cache  # Structure: {"<service_id>:<payload_hash>": [game_dict, ...]}
+        self.timeout = timeout
+
+    async def get_agent(self):
+        """Returns the agent, created on a worker thread the first time so its import doesn't block the event loop."""
+        if self._agent is None:
+            self._agent = await asyncio.to_thread(self._create_agent)
+        return self._agent
+
+    def _create_agent(self):
+        from agno.agent import Agent  # Takes about a second to import, only paid once the fallback is needed
+        return Agent(model=self.llm_model)
 
     @staticmethod
     def _apply_env(provider: str, llm_api_key: str | None) -> None:
@@ -33,9 +61,80 @@ class LLMParser:
         if env_var and llm_api_key and not os.getenv(env_var):
             os.environ[env_var] = llm_api_key
 
-    def to_dict(self, game_request: Response, service_id: str) -> list[dict]:
-        """Tries converting unstructured data into a list of game dicts using AI."""
-        game_data = game_request.content.decode("utf-8")
+    async def to_dict(self, game_request: Response, service_id: str) -> list[dict]:
+        """Tries converting unstructured data into a list of game dicts using AI.
+           Answers are cached by payload, so a parser that stays broken costs a single call per payload."""
+        cache_key = f"{service_id}:{hashlib.sha256(game_request.content).hexdigest()}"
+        if self._cache is not None and (games := await asyncio.to_thread(self._cache.get, cache_key)) is not None:
+            logger.debug(f"Reusing cached AI fallback result for '{service_id}'")
+            metrics.LLM_CALLS.inc(service=service_id, outcome="cached")
+            return games
+
+        # Pruning parses the whole payload, which takes seconds for large HTML pages
+        game_data = await asyncio.to_thread(LLMParser.prune, game_request.content)
         prompt = f"{LLMParser._prompt}\n\nData to analyze:\n{game_data}"
-        ai_data = self._agent.run(prompt).content
-        return [{**game, "service_id": service_id} for game in json.loads(ai_data)]
+        start_time = time.perf_counter()
+        try:
+            agent = await self.get_agent()
+            run_output = await asyncio.wait_for(agent.arun(prompt), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            metrics.LLM_CALLS.inc(service=service_id, outcome="timeout")
+            raise
+        except Exception:
+            metrics.LLM_CALLS.inc(service=service_id, outcome="error")
+            raise
+        metrics.LLM_CALLS.inc(service=service_id, outcome="answered")
+        run_metrics = run_output.metrics
+        metrics.LLM_TOKENS.inc(getattr(run_metrics, "input_tokens", 0) or 0, direction="input")
+        metrics.LLM_TOKENS.inc(getattr(run_metrics, "output_tokens", 0) or 0, direction="output")
+        logger.info(
+            f"AI fallback for '{service_id}' answered in {time.perf_counter() - start_time:.1f}s using "
+            f"{getattr(run_metrics, 'input_tokens', '?')} input and {getattr(run_metrics, 'output_tokens', '?')} output tokens "
+            f"(payload pruned from {len(game_request.content)} bytes to {len(game_data)} characters)"
+        )
+
+        games = [{**game, "service_id": service_id} for game in json.loads(run_output.content)]
+        if self._cache is not None:
+            await asyncio.to_thread(self._cache.set, cache_key, games)
+        return games
+
+    @staticmethod
+    def prune(payload: bytes) -> str:
+        """Strips everything irrelevant to finding free games from a JSON or HTML payload, then caps its length."""
+        text = payload.decode("utf-8", errors="replace")
+        try:
+            data = json.loads(text)
+        except ValueError:
+            text = LLMParser._prune_html(text)
+        else:
+            text = json.dumps(LLMParser._prune_json(data), ensure_ascii=False, separators=(",", ":"))
+        return text[:LLMParser._max_payload_tokens * LLMParser._chars_per_token]
+
+    @staticmethod
+    def _prune_json(data):
+        if isinstance(data, dict):
+            pruned = {key: LLMParser._prune_json(value) for key, value in data.items()
+                      if not LLMParser._is_irrelevant_key(key)}
+            return {key: value for key, value in pruned.items() if value not in (None, "", [], {})}
+        if isinstance(data, list):
+            return [LLMParser._prune_json(value) for value in data]
+        if isinstance(data, str) and "<" in data and ">" in data:  # HTML embedded in JSON (e.g. Steam)
+            return LLMParser._prune_html(data)
+        return data
+
+    @staticmethod
+    def _is_irrelevant_key(key: str) -> bool:
+        words = re.findall(r"[a-z]+", re.sub(r"([A-Z])", r" \1", key).lower())  # 'keyImages' -> ['key', 'images']
+        return any(word.startswith(LLMParser._irrelevant_keys) for word in words)
+
+    @staticmethod
+    def _prune_html(markup: str) -> str:
+        soup = parse_html(markup)
+        for tag in soup.find_all(LLMParser._irrelevant_tags):
+            tag.decompose()
+        for comment in soup.find_all(string=lambda string: isinstance(string, Comment)):
+            comment.extract()
+        for tag in soup.find_all(True):
+            tag.attrs = {name: value for name, value in tag.attrs.items()
+                         if name in LLMParser._kept_attributes or "price" in name}
+        return re.sub(r"\s+", " ", str(soup)).strip()
@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+import functools
+import math
+import threading
+import time
+
+from aiohttp import web
+
+from automatik import logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(label_names, label_values, extra=()):
+    pairs = [*zip(label_names, label_values), *extra]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return "+Inf" if value == math.inf else repr(float(value))
+
+
+class _Metric(ABC):
+    """Base of the metrics exported in the Prometheus text format.
+
+    Values are kept per combination of label values, given as keyword arguments. Metrics may be updated
+    from worker threads (e.g. database calls run through 'asyncio.to_thread'), so updates take a lock.
+    """
+    TYPE = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}  # Structure: {(label_value, ...): value}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(labels[label_name] for label_name in self.label_names)
+
+    @abstractmethod
+    def _samples(self):
+        """Yields (suffix, label values, extra labels, value) tuples."""
+        pass
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        with self._lock:
+            samples = list(self._samples())
+        for suffix, label_values, extra, value in samples:
+            lines.append(f"{self.name}{suffix}{_format_labels(self.label_names, label_values, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield "_total", key, (), value
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield "", key, (), value
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = (*sorted(buckets), math.inf)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0))
+            for i, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def time(self, **labels):
+        """Decorates a function so that the duration of each call is observed, exceptions included."""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start_time, **labels)
+            return wrapper
+        return decorator
+
+    def _samples(self):
+        for key, (counts, total) in self._values.items():
+            for upper_bound, count in zip(self.buckets, counts):
+                yield "_bucket", key, (("le", _format_value(upper_bound)),), count
+            yield "_sum", key, (), total
+            yield "_count", key, (), counts[-1]
+
+
+REGISTRY = []
+
+SERVICE_POLL_SECONDS = Histogram(
+    "automatik_service_poll_seconds", "Time taken to request and parse a service.", ["service"]
+)
+SERVICE_PARSE_SECONDS = Histogram(
+    "automatik_service_parse_seconds", "Time taken to parse a changed service payload.", ["service"]
+)
+SERVICE_PAYLOAD_BYTES = Gauge(
+    "automatik_service_payload_bytes", "Size of the last payload received from a service.", ["service"]
+)
+SERVICE_SKIPPED_PAYLOADS = Counter(
+    "automatik_service_skipped_payloads", "Payloads not parsed because they didn't change.", ["service"]
+)
+SERVICE_ERRORS = Counter(
+    "automatik_service_errors", "Failed polls by service and reason.", ["service", "reason"]
+)
+MONGO_OPERATION_SECONDS = Histogram(
+    "automatik_mongo_operation_seconds", "Duration of database operations.", ["operation"]
+)
+BROADCAST_GUILD_SECONDS = Histogram(
+    "automatik_broadcast_guild_seconds", "Time taken to deliver the messages of a guild."
+)
+BROADCAST_SECONDS = Histogram(
+    "automatik_broadcast_seconds", "Time from the detection of games to their last delivery in a batch.",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+BROADCAST_MESSAGES = Counter(
+    "automatik_broadcast_messages", "Notification messages sent by outcome.", ["outcome"]
+)
+LLM_CALLS = Counter(
+    "automatik_llm_calls", "AI fallback calls by outcome.", ["service", "outcome"]
+)
+LLM_TOKENS = Counter(
+    "automatik_llm_tokens", "Tokens used by the AI fallback.", ["direction"]
+)
+IGDB_REQUESTS = Counter(
+    "automatik_igdb_requests", "Requests sent to IGDB and Twitch by endpoint and outcome.", ["endpoint", "outcome"]
+)
+
+
+def render():
+    """Returns every metric in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+async def start_metrics_server(port, host="127.0.0.1"):
+    """Serves the metrics on 'http://<host>:<port>/metrics', returns the runner which has to be cleaned up."""
+    async def handle_metrics(_):
+        return web.Response(body=render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
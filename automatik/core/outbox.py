@@ -0,0 +1,118 @@
+import datetime
+from collections import namedtuple
+
+import pymongo
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from automatik.core import metrics
+from automatik.core.game import GameAdapter
+from automatik.core.subscribers import Subscriber
+
+Delivery = namedtuple("Delivery", ["id", "guild_id", "subscriber", "game", "attempts", "detected_at", "claim"])
+
+
+class DeliveryOutbox:
+    """Durable queue of notifications stored in a MongoDB collection, one document per (free game, guild).
+
+    A delivery goes from 'pending' to 'claimed' while it's being sent and ends either 'done' or 'failed'.
+    Transient errors put it back to 'pending' with an exponential backoff, and claims which are never
+    settled (e.g. the process crashed mid-broadcast) can be claimed again once 'claim_timeout' expires.
+    The document '_id' is derived from the free period of the game (the '_id' of its 'free_games' document)
+    and the guild, so enqueueing the same delivery twice has no effect, whichever announcement it comes
+    from, while a game which becomes free again is sent again.
+    """
+
+    def __init__(self, collection, claim_timeout=10 * 60, max_attempts=5, retry_delay=60, retention=30 * 24 * 60 * 60):
+        self._collection = collection
+        self.claim_timeout = claim_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._collection.create_index([("shard_id", pymongo.ASCENDING), ("status", pymongo.ASCENDING)])
+        self._collection.create_index("created_at", expireAfterSeconds=retention)
+
+    @staticmethod
+    def delivery_id(free_id, guild_id):
+        return f"{free_id}:{guild_id}"
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="outbox_enqueue")
+    def enqueue(self, deliveries, detected_at):
+        """Adds (free_id, guild_id, shard_id, Subscriber, Game) deliveries as pending, returns how many weren't queued yet."""
+        if not deliveries:
+            return 0
+        now = datetime.datetime.now(datetime.timezone.utc)
+        result = self._collection.bulk_write([
+            UpdateOne({"_id": self.delivery_id(free_id, guild_id)}, {"$setOnInsert": {
+                "guild_id": guild_id,
+                "shard_id": shard_id,
+                "channel_id": subscriber.channel_id,
+                "mention_role": subscriber.mention_role,
+                "webhook_url": subscriber.webhook_url,
+                "game": GameAdapter.to_dict(game),
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "detected_at": detected_at,
+                "created_at": now
+            }}, upsert=True)
+            for free_id, guild_id, shard_id, subscriber, game in deliveries
+        ], ordered=False)
+        return result.upserted_count
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="outbox_claim")
+    def claim(self, shard_ids, limit):
+        """Claims up to 'limit' deliveries that are due on the given shards and returns them."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        claimable = {
+            "shard_id": {"$in": list(shard_ids)},
+            "$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "claimed", "claimed_until": {"$lte": now}}
+            ]
+        }
+        delivery_ids = [document["_id"] for document in self._collection.find(claimable, {"_id": 1}).limit(limit)]
+        if not delivery_ids:
+            return []
+        # The filter is checked again by the update, so a delivery can't end up claimed twice
+        claim = ObjectId()
+        self._collection.update_many(
+            {"_id": {"$in": delivery_ids}, **claimable},
+            {"$set": {"status": "claimed", "claim": claim, "claimed_until": now + datetime.timedelta(seconds=self.claim_timeout)}}
+        )
+        return [self._to_delivery(document) for document in self._collection.find({"claim": claim})]
+
+    @metrics.MONGO_OPERATION_SECONDS.time(operation="outbox_settle")
+    def settle(self, delivered, failed, retried):
+        """Stores the outcome of claimed deliveries with a single bulk write.
+           'failed' and 'retried' are lists of (Delivery, reason) pairs, deliveries which ran out of
+           attempts are marked as failed instead of retried."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        operations = [
+            UpdateOne({"_id": delivery.id, "claim": delivery.claim}, {"$set": {"status": "done", "completed_at": now}})
+            for delivery in delivered
+        ]
+        for delivery, reason in failed:
+            operations.append(UpdateOne({"_id": delivery.id, "claim": delivery.claim},
+                                        {"$set": {"status": "failed", "error": reason, "completed_at": now}}))
+        for delivery, reason in retried:
+            attempts = delivery.attempts + 1
+            if attempts >= self.max_attempts:
+                update = {"status": "failed", "error": reason, "attempts": attempts, "completed_at": now}
+            else:
+                delay = datetime.timedelta(seconds=self.retry_delay * 2 ** delivery.attempts)
+                update = {"status": "pending", "error": reason, "attempts": attempts, "next_attempt_at": now + delay}
+            operations.append(UpdateOne({"_id": delivery.id, "claim": delivery.claim}, {"$set": update}))
+        if operations:
+            self._collection.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def _to_delivery(document):
+        return Delivery(
+            document["_id"],
+            document["guild_id"],
+            Subscriber(document["channel_id"], document["mention_role"], document.get("webhook_url")),
+            GameAdapter.to_object(document["game"]),
+            document["attempts"],
+            document["detected_at"],
+            document["claim"]
+        )
@@ -0,0 +1,132 @@
+import contextlib
+import cProfile
+import datetime
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+from automatik import logger
+
+
+class CycleProfiler:
+    """Profiles the bot's cycles on demand, meant to find out where the time goes in production.
+
+    Once armed, the next cycle which does some work (or every cycle within a time window) runs under
+    cProfile, and the wall time of each phase is measured. Before Python 3.12 cProfile only sees the
+    thread it was enabled on, so functions run on worker threads are profiled separately through 'wrap'
+    and merged afterwards. Since 3.12 it's built on 'sys.monitoring', which covers every thread and only
+    allows one profiler at a time, so 'wrap' leaves functions untouched there.
+    When disarmed, 'phase' and 'wrap' cost a single attribute check.
+    """
+
+    def __init__(self, output_dir="./automatik/logs"):
+        self.output_dir = output_dir
+        self._armed = False
+        self._window_end = None  # Unix timestamp, None when profiling just the next cycle
+        self._profile = None  # Only set while a cycle is being profiled
+        self._thread_profiles = []
+        self._phases = {}  # Structure: {phase: seconds}
+        self._lock = threading.Lock()
+
+    @property
+    def is_armed(self):
+        return self._armed
+
+    def arm(self, seconds=None):
+        """Profiles the next cycle which does some work, or every cycle during the next 'seconds' seconds."""
+        if self._profile is not None:  # Re-armed while profiling, the running profile is discarded
+            self._profile.disable()
+        self._armed = True
+        self._window_end = time.time() + seconds if seconds else None
+        self._reset()
+
+    def _reset(self):
+        self._profile = None
+        self._thread_profiles = []
+        self._phases = {}
+
+    def start_cycle(self):
+        if not self._armed:
+            return
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+        self._profile.enable()  # Cycles of a time window accumulate in the same profile
+
+    def end_cycle(self):
+        """Stops profiling the current cycle, the report is written once the cycle or the window is over.
+           Returns the paths of the files written, if any."""
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        if self._window_end is not None and time.time() < self._window_end:
+            return None
+        if self._window_end is None and not self._phases:  # Nothing happened, waits for a cycle doing some work
+            self._reset()
+            return None
+        paths = self._write_report()
+        self._armed = False
+        self._reset()
+        return paths
+
+    @contextlib.contextmanager
+    def _measure(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0) + elapsed
+
+    def phase(self, name):
+        """Context manager adding the wall time of its block to a phase (e.g. 'fetch' or 'send')."""
+        if self._profile is None:
+            return contextlib.nullcontext()
+        return self._measure(name)
+
+    def wrap(self, function):
+        """Returns 'function' profiled on its own, for functions run on worker threads."""
+        if self._profile is None or sys.version_info >= (3, 12):
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(function, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._thread_profiles.append(profile)
+        return wrapper
+
+    def _write_report(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"profile-{datetime.datetime.now():%Y%m%d-%H%M%S}"
+        stats_path = os.path.join(self.output_dir, f"{name}.pstats")
+        summary_path = os.path.join(self.output_dir, f"{name}.txt")
+
+        stats = pstats.Stats(self._profile)
+        with self._lock:
+            for profile in self._thread_profiles:
+                stats.add(profile)
+            phases = dict(self._phases)
+        stats.dump_stats(stats_path)
+
+        summary = io.StringIO()
+        summary.write("Wall time per phase (phases run concurrently or on worker threads may overlap)\n")
+        for phase_name, seconds in sorted(phases.items(), key=lambda item: item[1], reverse=True):
+            summary.write(f"  {phase_name:<10}{seconds:>10.3f}s\n")
+        summary.write("\n")
+        pstats.Stats(stats_path, stream=summary).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+        with open(summary_path, "w", encoding="utf-8") as summary_file:
+            summary_file.write(summary.getvalue())
+
+        logger.info(f"Profile written to '{stats_path}', summary in '{summary_path}'")
+        return stats_path, summary_path
+
+
+PROFILER = CycleProfiler()
@@ -0,0 +1,66 @@
+import random
+import time
+from datetime import datetime, timezone
+
+from automatik import logger
+
+
+class _ServiceSchedule:
+    """Polling state of a single service."""
+
+    def __init__(self):
+        self.next_poll = 0  # Unix timestamp, services are due right after startup
+        self.failures = 0  # Consecutive failed polls
+
+
+class PollingScheduler:
+    """Decides when every service has to be polled.
+
+    Each service is polled on its own interval (see 'BaseService.get_poll_interval') with some random
+    jitter, so requests don't line up. Failed polls back off exponentially and, after 'breaker_threshold'
+    consecutive failures, the service's circuit opens: it's left alone for 'breaker_cooldown' seconds
+    and then tried once, which closes the circuit on success or opens it again on failure.
+    """
+
+    def __init__(self, jitter=0.1, max_backoff=2 * 60 * 60, breaker_threshold=5, breaker_cooldown=6 * 60 * 60):
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._schedules = {}  # Structure: {service_id: _ServiceSchedule}
+
+    def _get_schedule(self, service):
+        return self._schedules.setdefault(service.SERVICE_ID, _ServiceSchedule())
+
+    def due(self, services, now=None):
+        """Returns the services whose next poll time has been reached."""
+        now = time.time() if now is None else now
+        return [service for service in services if self._get_schedule(service).next_poll <= now]
+
+    def record_success(self, service, now=None):
+        now = time.time() if now is None else now
+        schedule = self._get_schedule(service)
+        if schedule.failures >= self.breaker_threshold:
+            logger.info(f"'{service.SERVICE_ID}' recovered, closing its circuit")
+        schedule.failures = 0
+        interval = service.get_poll_interval(datetime.fromtimestamp(now, timezone.utc))
+        schedule.next_poll = now + self._add_jitter(interval)
+
+    def record_failure(self, service, now=None):
+        now = time.time() if now is None else now
+        schedule = self._get_schedule(service)
+        schedule.failures += 1
+        if schedule.failures >= self.breaker_threshold:
+            delay = self.breaker_cooldown
+            logger.warning(
+                f"'{service.SERVICE_ID}' failed {schedule.failures} time(s) in a row, "
+                f"circuit open for the next {delay / 60:.0f} minute(s)"
+            )
+        else:
+            interval = service.get_poll_interval(datetime.fromtimestamp(now, timezone.utc))
+            delay = min(interval * 2 ** schedule.failures, self.max_backoff)
+            logger.debug(f"'{service.SERVICE_ID}' failed {schedule.failures} time(s) in a row, backing off {delay:.0f}s")
+        schedule.next_poll = now + self._add_jitter(delay)
+
+    def _add_jitter(self, delay):
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
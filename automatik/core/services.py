@@ -7,11 +7,13 @@ from automatik.core.base_service import BaseService
 
 class ServiceLoader:
     services = []
+    assets = {}  # Structure: {service_id: logo bytes}, kept in memory so broadcasts never touch the disk
 
     @staticmethod
-    def load_services():
+    def load_services(database=None):
         """Instantiates the 'Main' class of each service and appends said instance to 'ServiceLoader.services'"""
         ServiceLoader.services = []  # Avoids service duplication after reload
+        ServiceLoader.assets = {}
         for i in os.listdir(os.path.join(SRC_DIR, "services")):
             service_name, service_extension = os.path.splitext(i)
 
@@ -20,7 +22,12 @@ class ServiceLoader:
                     imported_service = importlib.import_module(f"automatik.services.{service_name}")
                     # Creates an instance of the Main class of the imported service
                     Klass = getattr(imported_service, "Service")
-                    ServiceLoader.services.append(Klass())
+                    service = Klass()
+                    if database is not None:
+                        service.setup(database)
+                    with open(os.path.join(SRC_DIR, "services", "assets", service.SERVICE_IMAGE), "rb") as logo:
+                        ServiceLoader.assets[service.SERVICE_ID] = logo.read()
+                    ServiceLoader.services.append(service)
                     logger.debug(f"Service '{service_name}' loaded successfully")
                 except AttributeError:
                     logger.exception(f"Service '{service_name}' could not be loaded (missing 'Service' class)")
@@ -32,6 +39,11 @@ class ServiceLoader:
     def get_service_ids():
         return [i.SERVICE_ID for i in ServiceLoader.services]
 
+    @staticmethod
+    def get_asset(service_id) -> bytes | None:
+        """Returns the logo of a service as loaded by 'load_services'."""
+        return ServiceLoader.assets.get(service_id)
+
     @staticmethod
     def get_service(service_id) -> BaseService | None:
         for service in ServiceLoader.services:
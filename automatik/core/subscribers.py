@@ -0,0 +1,42 @@
+from collections import namedtuple
+
+Subscriber = namedtuple("Subscriber", ["channel_id", "mention_role", "webhook_url"], defaults=[None])
+
+
+class SubscriberIndex:
+    """Inverted index from service IDs to the guilds that must be notified about their games.
+
+    Only guilds with a selected channel and the service enabled are indexed, so broadcasts
+    never have to look at guilds that opted out or have nowhere to receive notifications.
+    """
+
+    def __init__(self):
+        self._index = {}  # Structure: {service_id: {guild_id: Subscriber}}
+
+    def rebuild(self, configs):
+        """Replaces the whole index with the given guild configs."""
+        self._index = {}
+        for config in configs:
+            self.update(config)
+
+    def update(self, config):
+        """Indexes a guild config again, must be called whenever its channel, role or services change."""
+        guild_id = config["_id"]
+        subscriber = Subscriber(config.get("selected_channel"), config.get("mention_role"), config.get("webhook_url"))
+        for service_id, enabled in config.get("services", {}).items():
+            subscribers = self._index.setdefault(service_id, {})
+            if enabled and subscriber.channel_id:
+                subscribers[guild_id] = subscriber
+            else:
+                subscribers.pop(guild_id, None)
+
+    def remove(self, guild_id):
+        for subscribers in self._index.values():
+            subscribers.pop(guild_id, None)
+
+    def get_subscribers(self, service_id):
+        """Returns a {guild_id: Subscriber} dict of every guild subscribed to a service."""
+        return dict(self._index.get(service_id, {}))  # Copied, the index may be updated from a watcher thread
+
+    def __len__(self):
+        return len({guild_id for subscribers in self._index.values() for guild_id in subscribers})
@@ -1,4 +1,5 @@
 import json
+from datetime import datetime, timedelta
 
 import requests
 from requests.exceptions import HTTPError, Timeout
@@ -16,10 +17,25 @@ class Service(BaseService):
 
     _base_url = "https://store.epicgames.com/store/us-US/"
     _endpoint = "https://store-site-backend-static.ak.epicgames.com/freeGamesPromotions"
+    # Free games rotate every Thursday at 11AM US Eastern, that is 15:00 or 16:00 UTC depending on DST
+    _rollover_weekday = 3
+    _rollover_window = (timedelta(hours=14, minutes=50), timedelta(hours=16, minutes=30))
+    _rollover_poll_interval = 60
+
+    def get_poll_interval(self, now):
+        week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        window_start = week_start + timedelta(days=self._rollover_weekday) + self._rollover_window[0]
+        window_end = week_start + timedelta(days=self._rollover_weekday) + self._rollover_window[1]
+        if window_start <= now <= window_end:
+            return self._rollover_poll_interval
+        if now > window_end:
+            window_start += timedelta(weeks=1)
+        # The regular interval is cut short so the first poll of the window isn't delayed
+        return max(self._rollover_poll_interval, min(self.POLL_INTERVAL, (window_start - now).total_seconds()))
 
     def make_request(self):
         try:
-            return requests.get(self._endpoint)
+            return requests.get(self._endpoint, headers=self._conditional_headers(), timeout=self.FETCH_TIMEOUT)
         except (HTTPError, Timeout, requests.exceptions.ConnectionError) as e:
             logger.error(f"Request to {self.SERVICE_NAME} by service \'{self.SERVICE_ID}\' failed")
             raise GameRetrievalException(e)
@@ -49,4 +65,4 @@ class Service(BaseService):
             raise InvalidGameDataException(e)
 
     def get_free_games(self):
-        return self._process_request(self.make_request())
+        return self._process_if_changed(self.make_request())
@@ -19,7 +19,7 @@ class Service(BaseService):
 
     def make_request(self):
         try:
-            return requests.get(self._endpoint, impersonate="chrome")
+            return requests.get(self._endpoint, headers=self._conditional_headers(), impersonate="chrome", timeout=self.FETCH_TIMEOUT)
         except (HTTPError, Timeout, ConnectionError) as e:
             logger.error(f"Request to {self.SERVICE_NAME} by service \'{self.SERVICE_ID}\' failed")
             raise GameRetrievalException(e)
@@ -38,4 +38,4 @@ class Service(BaseService):
             raise InvalidGameDataException(e)
 
     def get_free_games(self):
-        return self._process_request(self.make_request())
+        return self._process_if_changed(self.make_request())
@@ -1,13 +1,15 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
-from bs4 import BeautifulSoup
 from requests.exceptions import HTTPError, Timeout
 
 from automatik import logger
 from automatik.core.base_service import BaseService
+from automatik.core.cache import LRUCache
 from automatik.core.errors import GameRetrievalException, InvalidGameDataException
 from automatik.core.game import Game
+from automatik.utils.html_parsing import class_strainer, parse_html
 
 
 class Service(BaseService):
@@ -17,19 +19,42 @@ class Service(BaseService):
 
     _url = "https://store.steampowered.com/app/"
     _endpoint = "https://store.steampowered.com/search/results/?query&start=0&count=25&sort_by=Price_ASC&specials=1&infinite=1"
+    _dlc_cache_ttl = 30 * 24 * 60 * 60  # A product rarely stops (or starts) being a DLC
+    _dlc_workers = 8
+    # Search results are almost only result rows, straining them costs more than it saves, unlike store pages
+    _dlc_strainer = class_strainer("div", "game_area_dlc_bubble", "game_area_purchase_game_wrapper")
+
+    def __init__(self):
+        super().__init__()
+        self._dlc_cache = LRUCache(10000, self._dlc_cache_ttl)  # Replaced by a persistent cache on setup
+
+    def setup(self, database):
+        self._dlc_cache = database.get_cache("steam_dlc", self._dlc_cache_ttl)
 
     def is_dlc(self, app_id):
         response = self.make_request(self._url + app_id)
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = parse_html(response.content, self._dlc_strainer)
         dlc_area = bool(soup.find("div", {"class": "game_area_dlc_bubble"}))
         purchase_area = bool(soup.find("div", {"class": "game_area_purchase_game_wrapper"}))
 
         return dlc_area and purchase_area
 
+    def _classify_dlcs(self, product_ids):
+        """Returns a {product_id: is_dlc} dict, cache misses are resolved concurrently."""
+        verdicts = self._dlc_cache.get_many(product_ids)
+        if misses := [product_id for product_id in dict.fromkeys(product_ids) if product_id not in verdicts]:
+            with ThreadPoolExecutor(max_workers=self._dlc_workers) as executor:
+                resolved = dict(zip(misses, executor.map(self.is_dlc, misses)))
+            self._dlc_cache.set_many(resolved)
+            verdicts.update(resolved)
+            logger.debug(f"Classified {len(misses)} uncached Steam product(s), {len(product_ids) - len(misses)} cached")
+        return verdicts
+
     def make_request(self, endpoint=None):
         url = endpoint if endpoint else self._endpoint
+        headers = {} if endpoint else self._conditional_headers()
         try:
-            return requests.get(url)
+            return requests.get(url, headers=headers, timeout=self.FETCH_TIMEOUT)
         except (HTTPError, Timeout, requests.exceptions.ConnectionError) as e:
             logger.error(f"Request to {self.SERVICE_NAME} by service \'{self.SERVICE_ID}\' failed")
             raise GameRetrievalException(e)
@@ -39,11 +64,18 @@ class Service(BaseService):
 
         try:
             processed_data = json.loads(raw_data.content)["results_html"]
-            soup = BeautifulSoup(processed_data, "html.parser")
+            soup = parse_html(processed_data)
+            free_products = []
             for tag in soup.find_all("a", {"class": "search_result_row ds_collapse_flag"}):
                 product_id = tag.get("data-ds-appid") or tag.get("data-ds-bundleid")
                 price_div = tag.find("div", {"class": "search_price_discount_combined"})
-                if price_div is None or price_div.get("data-price-final") != "0" or self.is_dlc(product_id):
+                if price_div is None or price_div.get("data-price-final") != "0":
+                    continue
+                free_products.append((product_id, tag))
+
+            dlc_verdicts = self._classify_dlcs([product_id for product_id, _ in free_products])
+            for product_id, tag in free_products:
+                if dlc_verdicts[product_id]:
                     continue
                 game = Game(tag.find("span", {"class": "title"}).text, self._url + product_id, self.SERVICE_ID)
                 parsed_games.append(game)
@@ -52,4 +84,4 @@ class Service(BaseService):
             raise InvalidGameDataException(e)
 
     def get_free_games(self):
-        return self._process_request(self.make_request())
+        return self._process_if_changed(self.make_request())
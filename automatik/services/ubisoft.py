@@ -1,13 +1,13 @@
 import json
 
 import requests
-from bs4 import BeautifulSoup
 from requests.exceptions import HTTPError, Timeout
 
 from automatik import logger
 from automatik.core.base_service import BaseService
 from automatik.core.errors import GameRetrievalException, InvalidGameDataException
 from automatik.core.game import Game
+from automatik.utils.html_parsing import class_strainer, parse_html
 
 
 class Service(BaseService):
@@ -17,10 +17,11 @@ class Service(BaseService):
 
     _base_url = "https://store.ubisoft.com"
     _endpoint = "https://store.ubisoft.com/us/free-games?lang=en_US"
+    _tiles_strainer = class_strainer("div", "product-tile")
 
     def make_request(self):
         try:
-            return requests.get(self._endpoint)
+            return requests.get(self._endpoint, headers=self._conditional_headers(), timeout=self.FETCH_TIMEOUT)
         except (HTTPError, Timeout, requests.exceptions.ConnectionError) as e:
             logger.error(f"Request to {self.SERVICE_NAME} by service \'{self.SERVICE_ID}\' failed")
             raise GameRetrievalException(e)
@@ -29,7 +30,7 @@ class Service(BaseService):
         parsed_games = []
 
         try:
-            soup = BeautifulSoup(raw_data.content, "html.parser")
+            soup = parse_html(raw_data.content, self._tiles_strainer)
             for game in soup.find_all("div", {"class": "product-tile"}):
                 if game.find("div", {"class": "card-subtitle"}).text.strip() == "Free":
                     game_title = game.find("div", {"class": "prod-title"}).text.strip()
@@ -41,4 +42,4 @@ class Service(BaseService):
             raise InvalidGameDataException(e)
 
     def get_free_games(self):
-        return self._process_request(self.make_request())
+        return self._process_if_changed(self.make_request())
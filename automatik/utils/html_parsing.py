@@ -0,0 +1,52 @@
+import importlib.util
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+from automatik import logger
+
+
+def _detect_backend():
+    """Returns the fastest tree builder available, lxml is several times faster than Python's own parser."""
+    return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+def resolve_backend(name):
+    """Returns 'name' if BeautifulSoup has a tree builder for it, otherwise the fastest backend available."""
+    if name and builder_registry.lookup(str(name)) is None:
+        logger.warning(f"Unknown or unavailable HTML parser {name!r}, using {_detect_backend()!r} instead")
+        return _detect_backend()
+    return str(name) if name else _detect_backend()
+
+
+PARSER_BACKEND = resolve_backend(os.environ.get("HTML_PARSER"))
+PARTIAL_PARSING = True  # Only meant to be disabled when comparing against full parsing
+
+
+def class_strainer(tag_name, *class_names) -> SoupStrainer:
+    """Returns a strainer matching tags that have any of the given classes.
+
+    Strainers see the raw 'class' attribute while parsing (e.g. "search_result_row ds_collapse_flag"),
+    so a plain 'class_' filter would only match tags whose attribute is exactly that single class.
+    """
+    pattern = "|".join(re.escape(class_name) for class_name in class_names)
+    return SoupStrainer(tag_name, class_=re.compile(rf"(?:^|\s)(?:{pattern})(?:\s|$)"))
+
+
+def parse_html(markup, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """Parses HTML with the configured backend.
+
+    When 'parse_only' is given, only the matching tags (and everything inside them) are kept in the
+    tree, which saves building thousands of elements that are never looked at. Searches done on the
+    partial tree return the same results as on a complete one as long as they only target those tags.
+    """
+    return BeautifulSoup(markup, PARSER_BACKEND, parse_only=parse_only if PARTIAL_PARSING else None)
+
+
+def find_meta_content(markup, property_name):
+    """Returns the content of a '<meta property=...>' tag (e.g. 'og:image'), or None if it's missing."""
+    soup = parse_html(markup, SoupStrainer("meta", property=property_name))
+    meta_tag = soup.find("meta", property=property_name)
+    return meta_tag["content"] if meta_tag else None
@@ -1,67 +1,160 @@
-import json
+import asyncio
+import re
 import time
 from functools import wraps
 from typing import Optional
 
-import requests
-from igdb.wrapper import IGDBWrapper
+import aiohttp
 
 from automatik import logger
+from automatik.core import metrics
 
 
 def ensure_token(func):
-    """Decorator to ensure token is valid before API calls."""
+    """Decorator to ensure token is valid before API calls. Concurrent callers wait on the same refresh."""
     @wraps(func)
-    def wrapper(self, *args, **kwargs):
-        if not self.wrapper or time.time() >= self.token_expiry:
-            self._refresh_token()
-        return func(self, *args, **kwargs) if self.wrapper else None
+    async def wrapper(self, *args, **kwargs):
+        if not self._token or time.time() >= self.token_expiry:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.ensure_future(self._refresh_token())
+            await asyncio.shield(self._refresh_task)  # A cancelled caller mustn't cancel the refresh of the rest
+        return await func(self, *args, **kwargs) if self._token else None
     return wrapper
 
 
+class _RateLimiter:
+    """Spaces out requests so that no more than 'rate' of them start per second."""
+
+    def __init__(self, rate):
+        self._interval = 1 / rate
+        self._next_slot = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
 class IGDBClient:
+    _api_url = "https://api.igdb.com/v4/"
+    _token_url = "https://id.twitch.tv/oauth2/token"
+    _fields = "name, summary, rating, aggregated_rating, total_rating, genres.name, first_release_date"
+    _queries_per_request = 10  # Maximum number of queries allowed in a single multiquery request
+    _requests_per_second = 4  # IGDB rejects clients going over this rate
+    _request_timeout = 10
+    _not_found_ttl = 24 * 60 * 60  # Unknown titles are looked up again sooner, IGDB might add them later
 
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(self, client_id: str, client_secret: str, cache=None):
         self.client_id = client_id
         self.client_secret = client_secret
-        self.wrapper = None
+        self._cache = cache  # Structure: {normalized_title: game_data}, game_data is empty if IGDB doesn't know the title
+        self._token = None
+        self._refresh_task = None
+        self._session = None
+        self._rate_limiter = _RateLimiter(self._requests_per_second)
         self.token_expiry = 0
-        self._refresh_token()
 
-    def _refresh_token(self):
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Pooled HTTP session, created on first use since it must belong to the running event loop."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self._request_timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def _refresh_token(self):
         """Fetch a new OAuth token from Twitch."""
         try:
-            response = requests.post(
-                "https://id.twitch.tv/oauth2/token",
+            async with self.session.post(
+                self._token_url,
                 params={
                     "client_id": self.client_id,
                     "client_secret": self.client_secret,
                     "grant_type": "client_credentials"
                 }
-            )
-            response.raise_for_status()
-            data = response.json()
-            token = data["access_token"]
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
             expires_in = data.get("expires_in", 3600)
             # Refresh 60s before expiry for safety
             self.token_expiry = time.time() + expires_in - 60
-            self.wrapper = IGDBWrapper(self.client_id, token)
+            self._token = data["access_token"]
+            metrics.IGDB_REQUESTS.inc(endpoint="token", outcome="success")
             logger.debug("IGDB OAuth token refreshed successfully")
         except Exception as e:
+            metrics.IGDB_REQUESTS.inc(endpoint="token", outcome="error")
             logger.error(f"Failed to refresh IGDB OAuth token: {e}")
-            self.wrapper = None
+            self._token = None
             self.token_expiry = 0
 
     @ensure_token
-    def get_game_data(self, game_name: str) -> Optional[dict]:
+    async def prefetch_token(self):
+        """Fetches the OAuth token ahead of the first lookup, meant to be run in the background after connecting."""
+        return True
+
+    async def _api_request(self, endpoint: str, query: str):
+        await self._rate_limiter.wait()
+        async with self.session.post(
+            self._api_url + endpoint,
+            headers={"Client-ID": self.client_id, "Authorization": f"Bearer {self._token}"},
+            data=query
+        ) as response:
+            metrics.IGDB_REQUESTS.inc(endpoint=endpoint, outcome="success" if response.ok else "error")
+            response.raise_for_status()
+            return await response.json()
+
+    @staticmethod
+    def normalize_title(game_name: str) -> str:
+        """Lowercases a title and strips symbols, so that e.g. 'Game™: Deluxe' and 'game deluxe' share a cache entry."""
+        return " ".join(re.sub(r"[^\w\s]", " ", game_name.lower()).split())
+
+    @staticmethod
+    def search_term(game_name: str) -> str:
+        """Strips the quotes and backslashes which would end or escape the search string of a query."""
+        return game_name.replace("\\", "").replace('"', "")
+
+    async def get_game_data(self, game_name: str) -> Optional[dict]:
+        return (await self.get_games_data([game_name]) or {}).get(game_name)
+
+    @ensure_token
+    async def get_games_data(self, game_names: list[str]) -> dict[str, Optional[dict]]:
+        """Returns a {game_name: data} dict, data being None for titles IGDB doesn't know or failed lookups.
+           Cached titles are answered from the cache, the rest are resolved with as few multiqueries as possible."""
+        titles = {game_name: self.normalize_title(game_name) for game_name in game_names}
+        found = await asyncio.to_thread(self._cache.get_many, set(titles.values())) if self._cache is not None else {}
+
+        # Normalized titles are only cache keys, IGDB matches the original ones much better
+        missing = list({title: game_name for game_name, title in titles.items() if title not in found}.items())
+        batches = [missing[i:i + self._queries_per_request] for i in range(0, len(missing), self._queries_per_request)]
+        for resolved in await asyncio.gather(*(self._multiquery(batch) for batch in batches)):
+            found.update(resolved)
+            if self._cache is not None:
+                await asyncio.to_thread(self._cache.set_many, {title: data for title, data in resolved.items() if data})
+                await asyncio.to_thread(self._cache.set_many, {title: data for title, data in resolved.items() if not data},
+                                        ttl=self._not_found_ttl)
+
+        return {game_name: found.get(title) or None for game_name, title in titles.items()}
+
+    async def _multiquery(self, titles: list[tuple[str, str]]) -> dict[str, dict]:
+        """Searches several (normalized title, game name) pairs in a single request, returns a dict keyed by normalized title.
+           Titles IGDB doesn't know are mapped to an empty dict, while titles whose lookup failed are left out so they're not cached."""
+        query = "".join(
+            f'query games "{i}" {{ search "{self.search_term(game_name)}"; fields {self._fields}; limit 1; }};'
+            for i, (_, game_name) in enumerate(titles)
+        )
         try:
-            query = f'search "{game_name}"; fields name, summary, rating, aggregated_rating, total_rating, genres.name, first_release_date; limit 1;'
-            response = self.wrapper.api_request('games', query)
-            games = json.loads(response)
-            return games[0] if games else None
+            results = await self._api_request("multiquery", query)
+            return {titles[int(result["name"])][0]: (result["result"][0] if result["result"] else {}) for result in results}
         except Exception as e:
-            logger.warning(f"IGDB lookup failed for '{game_name}': {e}")
-            return None
+            logger.warning(f"IGDB lookup failed for {[game_name for _, game_name in titles]}: {e}")
+            return {}
 
     @staticmethod
     def rating_to_stars(rating: float) -> str:
@@ -1,6 +1,9 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
 
 # ANSI color codes for console output
@@ -27,12 +30,57 @@ class _ColorFormatter(logging.Formatter):
         return super().format(record)
 
 
+class _JsonFormatter(logging.Formatter):
+    """Formatter writing one JSON object per line, for log shippers and 'jq'."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, _DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """Queue handler which leaves the formatting of the message to the handlers of the listener.
+
+    The message is merged with its arguments and exceptions are rendered to text on the logging thread,
+    as the originals may not outlive the record, but the exception is kept apart so that each output
+    format can place it on its own.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
 def create_logs_folder():
     os.makedirs("./automatik/logs", exist_ok=True)
 
 
-def create_custom_logger(logger_name: str, logging_level: str) -> logging.Logger:
-    """Creates the AutomatiK logger with colored console output and rotating file output."""
+def setup_logging(config) -> logging.Logger:
+    """Configures the AutomatiK logger from the .env settings, meant to be called once on startup."""
+    create_logs_folder()
+    logging_level = "DEBUG" if config.debug_messages else "INFO"
+    return create_custom_logger("automatik_logger", logging_level, config.log_format or "text")
+
+
+def create_custom_logger(logger_name: str, logging_level: str, log_format: str = "text") -> logging.Logger:
+    """Creates the AutomatiK logger with colored console output and rotating file output.
+       Records are only queued by the thread which logs them, a listener thread writes them to the
+       console and the file, so the event loop never blocks on I/O. The file is written as JSON lines
+       when 'log_format' is "json"."""
     logger = logging.getLogger(logger_name)
     logger.setLevel(logging_level)
 
@@ -44,9 +92,12 @@ def create_custom_logger(logger_name: str, logging_level: str) -> logging.Logger
     file_h = TimedRotatingFileHandler(
         "./automatik/logs/latest.log", when="midnight", backupCount=90, encoding="utf-8"
     )
-    file_h.setFormatter(logging.Formatter(_FILE_FORMAT, datefmt=_DATE_FORMAT))
+    file_h.setFormatter(_JsonFormatter() if log_format == "json" else logging.Formatter(_FILE_FORMAT, datefmt=_DATE_FORMAT))
 
-    logger.addHandler(stream_h)
-    logger.addHandler(file_h)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_h, file_h)
+    listener.start()
+    atexit.register(listener.stop)  # Flushes the records still queued on exit
+    logger.addHandler(_PreparedQueueHandler(log_queue))
     return logger
 
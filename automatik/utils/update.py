@@ -10,7 +10,7 @@ from automatik import __version__, logger
 def _get_remote_version_data():
     """Gets the last version's tag name from the remote repository."""
     try:
-        req = requests.get("https://api.github.com/repos/Axyss/AutomatiK/releases")
+        req = requests.get("https://api.github.com/repos/Axyss/AutomatiK/releases", timeout=10)
         remote_version_data = json.loads(req.content)[0]
     except (HTTPError, Timeout, requests.exceptions.ConnectionError):
         logger.warning("Could not check for updates: GitHub API request failed (network error)")
@@ -21,8 +21,10 @@ def _get_remote_version_data():
 
 
 def check_updates():
-    """Looks for newer versions."""
-    remote_version, remote_version_url = _get_remote_version_data()
+    """Looks for newer versions. Blocks on a request to GitHub, so it's meant to be run in the background."""
+    if (remote_version_data := _get_remote_version_data()) is None:
+        return
+    remote_version, remote_version_url = remote_version_data
     try:
         _parse_version = lambda v: tuple(map(int, v.lstrip("v").split(".")))
         if _parse_version(remote_version) > _parse_version(__version__):
@@ -0,0 +1,59 @@
+import importlib
+import os
+
+from automatik.utils import html_parsing
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+PAGES_ID = "pages"  # Fixture directory holding store pages, used by the 'og:image' lookups
+
+
+class RecordedResponse:
+    """Stand-in for an HTTP response, built from a payload stored on disk."""
+    status_code = 200
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.headers = {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+
+def load_service(service_id):
+    """Instantiates a service ready to parse recorded payloads without touching the network."""
+    service = importlib.import_module(f"automatik.services.{service_id}").Service()
+    if service_id == "steam":  # DLC checks download store pages, every product is treated as a base game instead
+        service._classify_dlcs = lambda product_ids: dict.fromkeys(product_ids, False)
+    return service
+
+
+def load_parser(fixture_id):
+    """Returns a function parsing a payload the way the bot does, the service is only instantiated once."""
+    if fixture_id == PAGES_ID:
+        return lambda payload: html_parsing.find_meta_content(payload, "og:image")
+    service = load_service(fixture_id)
+    return lambda payload: service._process_request(RecordedResponse(payload))
+
+
+def load_fixtures(fixtures_dir, fixture_id):
+    """Returns a {fixture_name: payload} dict with the recorded payloads of a service, sorted by name."""
+    directory = os.path.join(fixtures_dir, fixture_id)
+    if not os.path.isdir(directory):
+        return {}
+    fixtures = {}
+    for filename in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, filename), "rb") as fixture:
+            fixtures[os.path.splitext(filename)[0]] = fixture.read()
+    return fixtures
+
+
+def record_fixture(fixtures_dir, service_id, name="live"):
+    """Downloads the current payload of a service and stores it as a fixture, returns its path."""
+    response = load_service(service_id).make_request()
+    extension = ".json" if response.content.lstrip()[:1] in (b"{", b"[") else ".html"
+    os.makedirs(os.path.join(fixtures_dir, service_id), exist_ok=True)
+    path = os.path.join(fixtures_dir, service_id, name + extension)
+    with open(path, "wb") as fixture:
+        fixture.write(response.content)
+    return path
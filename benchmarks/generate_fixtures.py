@@ -0,0 +1,139 @@
+"""Writes synthetic small, typical and pathologically large payloads for every service into the fixtures directory.
+
+The payloads mimic the structure of the real store responses, noise included, and are generated from a
+fixed seed so that runs on different machines parse exactly the same bytes. Live payloads can be added
+next to them with 'python -m benchmarks.parser_backends --record'.
+
+Usage: python -m benchmarks.generate_fixtures [--fixtures DIR] [--force]
+"""
+import argparse
+import json
+import os
+import random
+
+from benchmarks._common import FIXTURES_DIR, PAGES_ID
+
+SIZES = {"small": 5, "typical": 60, "large": 5000}  # Number of products listed in each payload
+
+
+def _lorem(rng, words):
+    return " ".join(rng.choice(("free", "game", "action", "quest", "dark", "space", "legend", "city", "tale"))
+                    for _ in range(words))
+
+
+def _epic(rng, count):
+    elements = []
+    for i in range(count):
+        price = rng.choice((0, 0, 1999, 2999))
+        free = price and rng.random() < 0.3
+        elements.append({
+            "title": f"Epic Game {i}",
+            "id": f"{i:032x}",
+            "description": _lorem(rng, 40),
+            "offerType": rng.choice(("BASE_GAME", "BUNDLE")),
+            "productSlug": f"epic-game-{i}" if i % 4 else None,
+            "offerMappings": [{"pageSlug": f"epic-game-{i}", "pageType": "productHome"}],
+            "keyImages": [{"type": kind, "url": f"https://cdn.example.com/{i}/{kind}.jpg"}
+                          for kind in ("OfferImageWide", "OfferImageTall", "Thumbnail")],
+            "categories": [{"path": "games"}, {"path": "freegames"}],
+            "customAttributes": [{"key": f"attribute{n}", "value": _lorem(rng, 3)} for n in range(5)],
+            "price": {"totalPrice": {"originalPrice": price, "discount": price if free else 0, "currencyCode": "USD"}},
+            "promotions": {
+                "promotionalOffers": [{"promotionalOffers": [{"startDate": "2024-01-01T16:00:00.000Z"}]}] if free else [],
+                "upcomingPromotionalOffers": []
+            } if free or rng.random() < 0.5 else None
+        })
+    return json.dumps({"data": {"Catalog": {"searchStore": {"elements": elements}}}}).encode()
+
+
+def _humble(rng, count):
+    results = [{
+        "human_name": f"Humble Game {i}",
+        "human_url": f"humble-game-{i}",
+        "description": _lorem(rng, 30),
+        "platforms": ["windows", "mac"],
+        "standard_carousel_image": f"https://cdn.example.com/{i}.jpg",
+        "current_price": {"amount": 0 if rng.random() < 0.05 else rng.choice((4.99, 9.99)), "currency": "USD"},
+        "full_price": {"amount": 19.99, "currency": "USD"}
+    } for i in range(count)]
+    return json.dumps({"num_results": count, "results": results}).encode()
+
+
+def _steam(rng, count):
+    rows = []
+    for i in range(count):
+        price = "0" if rng.random() < 0.1 else str(rng.choice((499, 999)))
+        rows.append(
+            f'<a href="https://store.steampowered.com/app/{i}/" data-ds-appid="{i}" data-ds-itemkey="App_{i}" '
+            f'class="search_result_row ds_collapse_flag" data-search-page="1">'
+            f'<div class="search_capsule"><img src="https://cdn.example.com/{i}.jpg"></div>'
+            f'<div class="responsive_search_name_combined"><div class="search_name ellipsis">'
+            f'<span class="title">Steam Game {i}</span><div>{_lorem(rng, 8)}</div></div>'
+            f'<div class="search_price_discount_combined responsive_secondrow" data-price-final="{price}">'
+            f'<div class="discount_block search_discount_block"></div></div></div></a>'
+        )
+    return json.dumps({"success": 1, "results_html": "\n".join(rows), "total_count": count}).encode()
+
+
+def _boilerplate(rng, blocks):
+    """Scripts, styles and navigation found around the interesting bits of real store pages."""
+    return "".join(
+        f'<script>var config{n} = {json.dumps({"k": _lorem(rng, 10)})};</script>'
+        f'<nav class="menu"><ul>{"".join(f"<li><a href=/x{k}>{_lorem(rng, 2)}</a></li>" for k in range(8))}</ul></nav>'
+        for n in range(blocks)
+    )
+
+
+def _ubisoft(rng, count):
+    tiles = "".join(
+        f'<div class="product-tile card" data-itemid="{i}"><a href="/us/game-{i}.html" class="thumb-link">'
+        f'<img src="https://cdn.example.com/{i}.jpg"></a><div class="card-body">'
+        f'<div class="prod-title">Ubisoft Game {i}</div>'
+        f'<div class="card-subtitle">{"Free" if rng.random() < 0.1 else "$29.99"}</div></div></div>'
+        for i in range(count)
+    )
+    return (f'<!DOCTYPE html><html><head><title>Free games</title>{_boilerplate(rng, 20)}</head>'
+            f'<body>{_boilerplate(rng, 40)}<div class="search-result-content">{tiles}</div>'
+            f'{_boilerplate(rng, 20)}</body></html>').encode()
+
+
+def _page(rng, count):
+    return (f'<!DOCTYPE html><html><head><title>Game</title><meta property="og:title" content="Game">'
+            f'<meta property="og:image" content="https://cdn.example.com/promo.jpg">{_boilerplate(rng, 10)}</head>'
+            f'<body>{_boilerplate(rng, count)}</body></html>').encode()
+
+
+GENERATORS = {
+    "epic": (_epic, ".json"),
+    "humble": (_humble, ".json"),
+    "steam": (_steam, ".json"),
+    "ubisoft": (_ubisoft, ".html"),
+    PAGES_ID: (_page, ".html"),
+}
+
+
+def generate_fixtures(fixtures_dir=FIXTURES_DIR, force=False):
+    """Writes the missing synthetic fixtures (every fixture if 'force'), returns the paths written."""
+    written = []
+    for fixture_id, (generator, extension) in GENERATORS.items():
+        os.makedirs(os.path.join(fixtures_dir, fixture_id), exist_ok=True)
+        for size, count in SIZES.items():
+            path = os.path.join(fixtures_dir, fixture_id, size + extension)
+            if force or not os.path.exists(path):
+                with open(path, "wb") as fixture:
+                    fixture.write(generator(random.Random(f"{fixture_id}-{size}"), count))
+                written.append(path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory with one sub-directory per service")
+    parser.add_argument("--force", action="store_true", help="overwrite the synthetic fixtures already present")
+    args = parser.parse_args()
+    for path in generate_fixtures(args.fixtures, args.force):
+        print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compares the available HTML parser backends, with and without partial parsing, on recorded payloads (synthetic ones when none were recorded).
+
+Usage: python -m benchmarks.parser_backends [--fixtures DIR] [--repeat N] [--record]
+"""
+import argparse
+import importlib.util
+import time
+
+from automatik.utils import html_parsing
+from benchmarks._common import FIXTURES_DIR, PAGES_ID, load_fixtures, load_parser, record_fixture
+from benchmarks.generate_fixtures import generate_fixtures
+
+HTML_SERVICES = ("steam", "ubisoft")
+
+
+def _available_backends():
+    return ["html.parser"] + [backend for backend in ("lxml",) if importlib.util.find_spec(backend)]
+
+
+def _comparable(result):
+    """Turns the games parsed from a payload into a result which can be compared across backends."""
+    return result if result is None or isinstance(result, str) else sorted((game.NAME, game.LINK) for game in result)
+
+
+def _best_time(parse, payload, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(payload)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory with one sub-directory per service")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement, the fastest one is kept")
+    parser.add_argument("--record", action="store_true", help="download live payloads into the fixtures first")
+    args = parser.parse_args()
+
+    generate_fixtures(args.fixtures)  # Fixtures aren't versioned, synthetic ones are generated when missing
+    if args.record:
+        for service_id in HTML_SERVICES:
+            print(f"Recorded {record_fixture(args.fixtures, service_id)}")
+
+    print(f"{'fixture':<28}{'backend':<14}{'partial':<10}{'time (ms)':>12}{'speedup':>10}")
+    for fixture_id in (*HTML_SERVICES, PAGES_ID):
+        parse = load_parser(fixture_id)  # The backend is read on every parse, so the service is built once
+        for name, payload in load_fixtures(args.fixtures, fixture_id).items():
+            baseline_time, baseline_result = None, None
+            for backend in _available_backends():
+                for partial in (False, True):
+                    html_parsing.PARSER_BACKEND, html_parsing.PARTIAL_PARSING = backend, partial
+                    result = _comparable(parse(payload))
+                    elapsed = _best_time(parse, payload, args.repeat)
+                    if baseline_time is None:  # Python's parser building the complete tree, as the bot used to
+                        baseline_time, baseline_result = elapsed, result
+                    mismatch = "" if result == baseline_result else "  RESULTS DIFFER"
+                    print(f"{fixture_id + '/' + name:<28}{backend:<14}{str(partial):<10}"
+                          f"{elapsed * 1000:>12.2f}{baseline_time / elapsed:>9.2f}x{mismatch}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Replays recorded payloads through the parser of every service and reports throughput, latency and memory.
+
+Nothing is downloaded: each fixture in the fixtures directory is fed to the service's '_process_request'
+(or to the 'og:image' lookup for store pages). Missing synthetic fixtures are generated first. Results can
+be saved with '--save' and compared against a previous run with '--compare'. '--record' downloads the
+current payload of every benchmarked service first, stored as its 'live' fixture.
+
+Usage: python -m benchmarks.service_parsers [--fixtures DIR] [--iterations N] [--save FILE] [--compare FILE] [--record]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from automatik.utils import html_parsing
+from benchmarks._common import FIXTURES_DIR, PAGES_ID, load_fixtures, load_parser, record_fixture
+from benchmarks.generate_fixtures import GENERATORS, generate_fixtures
+
+
+def _percentile(sorted_values, percent):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def measure(parse, payload, iterations):
+    """Returns the statistics of parsing a payload 'iterations' times, plus a separate traced run for memory."""
+    parse(payload)  # Warm-up, imports and caches shouldn't count
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        parse(payload)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    tracemalloc.start()
+    parse(payload)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "size": len(payload),
+        "mb_per_s": len(payload) * iterations / sum(latencies) / 1e6,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "peak_kib": peak_memory / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory with one sub-directory per service")
+    parser.add_argument("--iterations", type=int, default=30, help="timed runs per fixture")
+    parser.add_argument("--only", nargs="*", default=list(GENERATORS), help="services to benchmark")
+    parser.add_argument("--save", help="write the results to a JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare the p50 latency against")
+    parser.add_argument("--record", action="store_true", help="download live payloads into the fixtures first")
+    args = parser.parse_args()
+
+    generate_fixtures(args.fixtures)
+    if args.record:
+        for service_id in args.only:
+            if service_id != PAGES_ID:  # Store pages depend on the games, there's no single page to record
+                print(f"Recorded {record_fixture(args.fixtures, service_id)}")
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous_results:
+            previous = json.load(previous_results)["results"]
+
+    print(f"Backend: {html_parsing.PARSER_BACKEND}, partial parsing: {html_parsing.PARTIAL_PARSING}\n")
+    print(f"{'fixture':<22}{'size (KiB)':>11}{'MB/s':>9}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+          f"{'p99 (ms)':>10}{'peak (KiB)':>12}{'vs prev':>9}")
+    results = {}
+    for fixture_id in args.only:
+        parse = load_parser(fixture_id)
+        for name, payload in load_fixtures(args.fixtures, fixture_id).items():
+            key = f"{fixture_id}/{name}"
+            # Pathologically large payloads are run fewer times, the point is spotting superlinear behavior
+            iterations = max(3, args.iterations * 100_000 // max(len(payload), 100_000))
+            stats = results[key] = measure(parse, payload, iterations)
+            change = f"{previous[key]['p50_ms'] / stats['p50_ms']:>8.2f}x" if key in previous else f"{'-':>9}"
+            print(f"{key:<22}{stats['size'] / 1024:>11.0f}{stats['mb_per_s']:>9.2f}{stats['p50_ms']:>10.2f}"
+                  f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['peak_kib']:>12.0f}{change}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as output:
+            json.dump({
+                "backend": html_parsing.PARSER_BACKEND,
+                "partial_parsing": html_parsing.PARTIAL_PARSING,
+                "results": results
+            }, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Measures how long the bot takes to start: importing it and, optionally, getting to 'on_ready'.
+
+Every run happens in a fresh interpreter, so nothing is cached between runs except by the OS. The import
+benchmark needs no configuration. '--ready' logs in for real, so it needs a valid .env file (DISCORD_TOKEN,
+DB_URI) and closes the bot as soon as it's ready.
+
+Usage: python -m benchmarks.startup [--runs N] [--modules N] [--ready]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("agno", "google.genai", "bs4", "lxml", "curl_cffi", "pymongo", "discord")
+
+_IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import automatik.bot
+print(json.dumps({{
+    "import_s": time.perf_counter() - start,
+    "loaded": [module for module in {HEAVY_MODULES!r} if module in sys.modules]
+}}))
+"""
+
+_READY_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import discord
+from automatik.bot import AutomatikBot
+from automatik.core.config import Config
+from automatik.utils.log_setup import setup_logging
+imported = time.perf_counter()
+config = Config(".env")
+setup_logging(config)
+bot = AutomatikBot(command_prefix="!mk ", intents=discord.Intents.default(), config=config)
+timings = {"import_s": imported - start}
+
+async def setup_done():
+    timings["setup_hook_s"] = time.perf_counter() - start
+
+async def ready():
+    timings["on_ready_s"] = time.perf_counter() - start
+    print(json.dumps(timings), flush=True)
+    await bot.close()
+
+original_setup_hook = bot.setup_hook
+async def setup_hook():
+    await original_setup_hook()
+    await setup_done()
+bot.setup_hook = setup_hook
+bot.add_listener(ready, "on_ready")
+bot.run(config.discord_token, log_handler=None)
+"""
+
+
+def _run(script):
+    """Runs a script in a fresh interpreter and returns the JSON it printed last."""
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(count):
+    """Returns the modules with the largest cumulative import time as reported by '-X importtime'."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import automatik.bot"], capture_output=True, text=True, check=True
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = (field.strip() for field in line[len("import time:"):].split("|"))
+            if "." not in name:  # Top level packages only, sub-modules are included in their parents
+                modules.append((int(cumulative) / 1e6, name))
+    return sorted(modules, reverse=True)[:count]
+
+
+def _describe(values):
+    return f"median {statistics.median(values):.3f}s, min {min(values):.3f}s, max {max(values):.3f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters started per measurement")
+    parser.add_argument("--modules", type=int, default=10, help="slowest top level imports to list")
+    parser.add_argument("--ready", action="store_true", help="also measure the time to 'on_ready' (logs in)")
+    args = parser.parse_args()
+
+    results = [_run(_IMPORT_SCRIPT) for _ in range(args.runs)]
+    print(f"import automatik.bot: {_describe([result['import_s'] for result in results])}")
+    print(f"Heavy modules loaded on import: {', '.join(results[0]['loaded']) or 'none'}\n")
+
+    print(f"{'module':<24}{'cumulative (s)':>15}")
+    for seconds, name in slowest_imports(args.modules):
+        print(f"{name:<24}{seconds:>15.3f}")
+
+    if args.ready:
+        results = [_run(_READY_SCRIPT) for _ in range(args.runs)]
+        print()
+        for key, label in (("import_s", "imports"), ("setup_hook_s", "logged in and set up"), ("on_ready_s", "on_ready")):
+            print(f"{label:<24}{_describe([result[key] for result in results])}")
+
+
+if __name__ == "__main__":
+    main()